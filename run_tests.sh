@@ -67,7 +67,12 @@ else:
 echo ""
 echo "5. Running unit tests..."
 if command -v pytest &> /dev/null; then
-    pytest tests/ -v --tb=short 2>/dev/null || echo "   ⚠️  Some tests failed"
+    # Spread tests across CPU cores when pytest-xdist is installed
+    PYTEST_ARGS="-v --tb=short"
+    if python -c "import xdist" 2>/dev/null; then
+        PYTEST_ARGS="$PYTEST_ARGS -n auto"
+    fi
+    pytest tests/ $PYTEST_ARGS 2>/dev/null || echo "   ⚠️  Some tests failed"
 else
     echo "   ⚠️  pytest not found"
 fi
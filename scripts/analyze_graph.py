@@ -11,6 +11,11 @@ from collections import Counter, defaultdict
 from typing import Dict, List, Tuple
 import re
 
+# Patrones precompilados (se aplican a cada nodo del grafo)
+YEAR_RE = re.compile(r'\d{4}')
+DECIMAL_RE = re.compile(r'\d+\.\d+')
+EURO_AMOUNT_RE = re.compile(r'€([\d,]+\.?\d*)')
+
 def analyze_lightrag_graph(working_dir: str = "simple_rag_knowledge"):
     """
     Analiza el grafo de conocimiento financiero
@@ -48,9 +53,9 @@ def analyze_lightrag_graph(working_dir: str = "simple_rag_knowledge"):
         node_lower = node.lower()
         
         # Detectar tipos
-        if re.search(r'\d{4}', node) or 'july' in node_lower or 'week' in node_lower:
+        if YEAR_RE.search(node) or 'july' in node_lower or 'week' in node_lower:
             entities_by_type['fechas'].append(node)
-        elif '€' in node or re.search(r'\d+\.\d+', node):
+        elif '€' in node or DECIMAL_RE.search(node):
             entities_by_type['montos'].append(node)
         elif any(cat in node_lower for cat in ['groceries', 'housing', 'transport', 'entertainment', 'food', 'shopping']):
             entities_by_type['categorías'].append(node)
@@ -166,7 +171,7 @@ def analyze_lightrag_graph(working_dir: str = "simple_rag_knowledge"):
     montos_encontrados = []
     for node in G.nodes():
         # Buscar patrones de montos en euros
-        monto_match = re.search(r'€([\d,]+\.?\d*)', node)
+        monto_match = EURO_AMOUNT_RE.search(node)
         if monto_match:
             try:
                 monto = float(monto_match.group(1).replace(',', ''))
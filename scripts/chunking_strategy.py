@@ -23,6 +23,11 @@ from collections import defaultdict
 import logging
 import sys
 
+# Add project root to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.utils.data_cache import load_transactions
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -94,16 +99,7 @@ class AdaptiveChunkGenerator:
         """Load and prepare transaction data from JSON or CSV"""
         if self.json_path and Path(self.json_path).exists():
             logger.info(f"Loading data from JSON: {self.json_path}")
-            with open(self.json_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            # Handle different JSON formats
-            if isinstance(data, dict) and 'transactions' in data:
-                transactions = data['transactions']
-            elif isinstance(data, list):
-                transactions = data
-            else:
-                transactions = data.get('data', [])
+            transactions = load_transactions(self.json_path)
             
             self.df = pd.DataFrame(transactions)
             
@@ -478,8 +474,10 @@ class AdaptiveChunkGenerator:
         weekday = date.strftime('%A')
         date_str = date.strftime('%B %d, %Y')
         
-        total_income = sum(t['Importe'] for t in transactions if t['Importe'] > 0)
-        total_expenses = abs(sum(t['Importe'] for t in transactions if t['Importe'] < 0))
+        # Single pass over the records, then masked reductions
+        amounts = np.fromiter((t['Importe'] for t in transactions), dtype=np.float64, count=len(transactions))
+        total_income = float(amounts[amounts > 0].sum())
+        total_expenses = float(abs(amounts[amounts < 0].sum()))
         net_flow = total_income - total_expenses
         
         narrative = [f"Financial Summary for {weekday}, {date_str}:"]
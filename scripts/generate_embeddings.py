@@ -11,8 +11,8 @@ from pathlib import Path
 from typing import Dict, List, Any
 from datetime import datetime
 from dotenv import load_dotenv
-from openai import OpenAI
-import time
+from openai import AsyncOpenAI
+import asyncio
 import argparse
 from glob import glob
 
@@ -23,7 +23,7 @@ class EmbeddingGenerator:
     """Generate embeddings for adaptive financial chunks"""
     
     def __init__(self):
-        self.client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+        self.client = AsyncOpenAI(api_key=os.getenv('OPENAI_API_KEY'))
         self.model = "text-embedding-3-small"
         self.chunks = []
         self.total_cost = 0.0
@@ -137,25 +137,49 @@ class EmbeddingGenerator:
         
         return estimated_cost
     
-    def generate_embeddings(self, batch_size: int = 20):
+    def generate_embeddings(self, batch_size: int = 20, max_concurrency: int = 4):
         """Generate embeddings for all chunks"""
+        return asyncio.run(self.agenerate_embeddings(batch_size, max_concurrency))
+    
+    async def agenerate_embeddings(self, batch_size: int = 20, max_concurrency: int = 4):
+        """Generate embeddings for all chunks, sending batches concurrently"""
         print(f"\n🚀 Starting embedding generation...")
         print(f"  - Model: {self.model}")
         print(f"  - Batch size: {batch_size}")
+        print(f"  - Concurrent requests: {max_concurrency}")
         
-        chunks_with_embeddings = []
         total_chunks = len(self.chunks)
+        total_batches = (total_chunks + batch_size - 1) // batch_size
         
-        for i in range(0, total_chunks, batch_size):
-            batch = self.chunks[i:i+batch_size]
-            batch_texts = [self.prepare_chunk_text(chunk) for chunk in batch]
-            
-            print(f"\n📦 Processing batch {i//batch_size + 1}/{(total_chunks + batch_size - 1)//batch_size}")
-            print(f"  - Chunks {i+1} to {min(i+batch_size, total_chunks)}")
-            
+        # Bounded concurrency keeps us within the API rate limits
+        semaphore = asyncio.Semaphore(max_concurrency)
+        batches = await asyncio.gather(*[
+            self._embed_batch(i, batch_size, total_batches, semaphore)
+            for i in range(0, total_chunks, batch_size)
+        ])
+        
+        # gather preserves submission order, so chunks keep their original order
+        chunks_with_embeddings = [chunk for batch in batches for chunk in batch]
+        
+        print(f"\n✅ Embedding generation complete!")
+        print(f"  - Total chunks processed: {len(chunks_with_embeddings)}")
+        print(f"  - Successful embeddings: {sum(1 for c in chunks_with_embeddings if 'embedding' in c)}")
+        print(f"  - Failed embeddings: {sum(1 for c in chunks_with_embeddings if 'embedding_error' in c)}")
+        print(f"  - Total cost: ${self.total_cost:.6f}")
+        
+        return chunks_with_embeddings
+    
+    async def _embed_batch(self, i: int, batch_size: int, total_batches: int,
+                           semaphore: asyncio.Semaphore) -> List[Dict]:
+        """Embed one batch of chunks starting at index i"""
+        batch = self.chunks[i:i+batch_size]
+        batch_texts = [self.prepare_chunk_text(chunk) for chunk in batch]
+        batch_embeddings = []
+        
+        async with semaphore:
             try:
                 # Generate embeddings for the batch
-                response = self.client.embeddings.create(
+                response = await self.client.embeddings.create(
                     model=self.model,
                     input=batch_texts
                 )
@@ -173,29 +197,20 @@ class EmbeddingGenerator:
                     chunk_with_embedding['embedding_model'] = self.model
                     chunk_with_embedding['embedding_generated_at'] = datetime.now().isoformat()
                     chunk_with_embedding['prepared_text'] = batch_texts[j]  # Store prepared text
-                    chunks_with_embeddings.append(chunk_with_embedding)
-                
-                print(f"  ✅ Batch completed (cost: ${batch_cost:.6f})")
+                    batch_embeddings.append(chunk_with_embedding)
                 
-                # Brief pause to respect rate limits
-                if i + batch_size < total_chunks:
-                    time.sleep(0.5)
+                print(f"  ✅ Batch {i//batch_size + 1}/{total_batches} completed "
+                      f"(chunks {i+1} to {i+len(batch)}, cost: ${batch_cost:.6f})")
                     
             except Exception as e:
-                print(f"  ❌ Error in batch: {e}")
+                print(f"  ❌ Error in batch {i//batch_size + 1}/{total_batches}: {e}")
                 # Add chunks without embeddings
                 for chunk in batch:
                     chunk_with_embedding = chunk.copy()
                     chunk_with_embedding['embedding_error'] = str(e)
-                    chunks_with_embeddings.append(chunk_with_embedding)
+                    batch_embeddings.append(chunk_with_embedding)
         
-        print(f"\n✅ Embedding generation complete!")
-        print(f"  - Total chunks processed: {len(chunks_with_embeddings)}")
-        print(f"  - Successful embeddings: {sum(1 for c in chunks_with_embeddings if 'embedding' in c)}")
-        print(f"  - Failed embeddings: {sum(1 for c in chunks_with_embeddings if 'embedding_error' in c)}")
-        print(f"  - Total cost: ${self.total_cost:.6f}")
-        
-        return chunks_with_embeddings
+        return batch_embeddings
     
     def save_embeddings(self, chunks_with_embeddings: List[Dict], output_path: str):
         """Save chunks with embeddings to JSON file - LightRAG ready format"""
@@ -252,27 +267,26 @@ class EmbeddingGenerator:
         """Save in a format optimized for LightRAG graph construction"""
         
         # Create documents in LightRAG format
-        documents = []
-        
-        for chunk in chunks_with_embeddings:
-            if 'embedding' in chunk:
-                doc = {
-                    'id': chunk.get('chunk_id', ''),
-                    'content': chunk.get('prepared_text', chunk.get('text', '')),
-                    'metadata': {
-                        'chunk_type': chunk.get('chunk_type', 'unknown'),
-                        'category': chunk.get('category', ''),
-                        'subcategory': chunk.get('subcategory', ''),
-                        'transaction_ids': chunk.get('transaction_ids', []),
-                        'date_range': chunk.get('date_range', {}),
-                        'temporal_info': chunk.get('temporal_info', {}),
-                        'entity_info': chunk.get('entity_info', {}),
-                        'pattern_info': chunk.get('pattern_info', {}),
-                        'statistical_summary': chunk.get('statistical_summary', {})
-                    },
-                    'embedding': chunk['embedding']
-                }
-                documents.append(doc)
+        documents = [
+            {
+                'id': chunk.get('chunk_id', ''),
+                'content': chunk.get('prepared_text', chunk.get('text', '')),
+                'metadata': {
+                    'chunk_type': chunk.get('chunk_type', 'unknown'),
+                    'category': chunk.get('category', ''),
+                    'subcategory': chunk.get('subcategory', ''),
+                    'transaction_ids': chunk.get('transaction_ids', []),
+                    'date_range': chunk.get('date_range', {}),
+                    'temporal_info': chunk.get('temporal_info', {}),
+                    'entity_info': chunk.get('entity_info', {}),
+                    'pattern_info': chunk.get('pattern_info', {}),
+                    'statistical_summary': chunk.get('statistical_summary', {})
+                },
+                'embedding': chunk['embedding']
+            }
+            for chunk in chunks_with_embeddings
+            if 'embedding' in chunk
+        ]
         
         lightrag_data = {
             'version': '1.0',
@@ -308,6 +322,12 @@ def main():
         default=20,
         help='Batch size for API calls (default: 20)'
     )
+    parser.add_argument(
+        '--max-concurrency',
+        type=int,
+        default=4,
+        help='Maximum concurrent API requests (default: 4)'
+    )
     parser.add_argument(
         '--skip-confirmation',
         action='store_true',
@@ -345,7 +365,10 @@ def main():
             return
     
     # Generate embeddings
-    chunks_with_embeddings = generator.generate_embeddings(batch_size=args.batch_size)
+    chunks_with_embeddings = generator.generate_embeddings(
+        batch_size=args.batch_size,
+        max_concurrency=args.max_concurrency
+    )
     
     # Save results
     generator.save_embeddings(chunks_with_embeddings, args.output)
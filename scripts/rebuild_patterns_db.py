@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Regenera la base de datos Hyperscan serializada de los patrones del anonimizador.
+Ejecutar tras modificar SpanishFinancialPatterns o al actualizar Hyperscan.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Añadir el directorio raíz al path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.processors.adaptive_anonymizer import AdaptiveAnonymizer
+from src.processors.pattern_db import DEFAULT_DB_PATH, HYPERSCAN_AVAILABLE, build_patterns_db
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Compila los patrones del anonimizador en una base de datos Hyperscan'
+    )
+    parser.add_argument(
+        '--output',
+        default=str(DEFAULT_DB_PATH),
+        help='Fichero de salida (por defecto: src/processors/patterns.hsdb)'
+    )
+    args = parser.parse_args()
+    
+    if not HYPERSCAN_AVAILABLE:
+        print("❌ Hyperscan no está instalado. Instala con: pip install hyperscan")
+        sys.exit(1)
+    
+    anonymizer = AdaptiveAnonymizer()
+    output = build_patterns_db(anonymizer.static_patterns, Path(args.output))
+    
+    print(f"✅ {len(anonymizer.static_patterns)} patrones compilados en: {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -15,6 +15,7 @@ import argparse
 sys.path.append(str(Path(__file__).parent.parent))
 
 from scripts.chunking_strategy import AdaptiveChunkGenerator
+from src.utils.data_cache import load_transactions
 
 # Configure logging
 logging.basicConfig(
@@ -54,19 +55,8 @@ def run_chunking_pipeline(
         
         # Load input data
         logger.info("\n📥 Cargando datos procesados...")
-        with open(input_file, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
-        # Determine data format
-        if isinstance(data, dict) and 'transactions' in data:
-            transactions = data['transactions']
-            metadata = data.get('metadata', {})
-        elif isinstance(data, list):
-            transactions = data
-            metadata = {}
-        else:
-            transactions = data
-            metadata = {}
+        # Cached: the chunk generator below reuses the parsed file
+        transactions = load_transactions(input_file)
         
         logger.info(f"  ✓ {len(transactions)} transacciones cargadas")
         
@@ -175,16 +175,16 @@ def main():
         # Convertir formato si es necesario
         if transactions and 'Fecha' in transactions[0]:
             # Formato directo de BBVA
-            converted_transactions = []
-            for t in transactions:
-                converted_transactions.append({
+            transactions = [
+                {
                     'date': t.get('Fecha', ''),
                     'description': t.get('Concepto', ''),
                     'amount': float(str(t.get('Importe', '0')).replace(',', '.').replace('EUR', '').strip()),
                     'category': CATEGORY_MAPPING.get(t.get('Categoría', 'Other'), 'otros'),
                     'balance': float(str(t.get('Saldo', '0')).replace(',', '.').replace('EUR', '').strip()) if t.get('Saldo') else 0
-                })
-            transactions = converted_transactions
+                }
+                for t in transactions
+            ]
         
         # Guardar transacciones originales
         with open(output_dir / 'transactions_raw.json', 'w', encoding='utf-8') as f:
@@ -228,9 +228,8 @@ def main():
         rag = PersonalFinanceLightRAG()
         
         # Guardar transacciones para RAG
-        rag_data = []
-        for i, t in enumerate(transactions):
-            rag_data.append({
+        rag_data = [
+            {
                 'id': f'tx_{i}',
                 'date': t.get('date', '2025-07-01'),
                 'metadata': {
@@ -243,7 +242,9 @@ def main():
                     'year': 2025,
                     'is_weekend': False
                 }
-            })
+            }
+            for i, t in enumerate(transactions)
+        ]
         
         # Guardar JSON temporal para RAG
         rag_json_path = output_dir / 'transactions_for_rag.json'
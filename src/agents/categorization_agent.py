@@ -7,11 +7,15 @@ BBVAExtractor handles all rule-based categorization
 import os
 import asyncio
 import json
+import re
 from typing import Dict, List, Optional, Any, Annotated
 from typing_extensions import TypedDict
 from datetime import datetime
 from pathlib import Path
 import uuid
+import weakref
+
+import httpx
 
 # LangGraph imports
 from langgraph.graph import StateGraph, END, START
@@ -21,10 +25,17 @@ from langgraph.store.memory import InMemoryStore
 
 # LangChain imports
 from langchain_openai import ChatOpenAI
+from openai import AsyncOpenAI
 from langchain_community.tools.tavily_search import TavilySearchResults
 from langchain_core.messages import BaseMessage, HumanMessage
 from langchain_core.runnables import RunnableConfig
 
+try:
+    import h2  # noqa: F401  (required for http2=True in httpx)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
 
 # ==================== State Definition ====================
 
@@ -99,51 +110,49 @@ class MerchantMemory:
         return age_days < days
 
 
-# ==================== Agent Nodes ====================
+# ==================== Shared HTTP Client ====================
 
-async def check_memory_node(state: TransactionCategorizationState, config: RunnableConfig) -> Dict:
-    """
-    Check if merchant exists in memory cache
-    """
-    merchant_name = state.get("merchant_name", "")
-    
-    # Initialize memory
-    memory = MerchantMemory(config.get("configurable", {}).get("cache_file", "data/merchant_cache.json"))
-    merchant_info = memory.get_merchant(merchant_name)
-    
-    if merchant_info and memory.is_recent(merchant_info):
-        # Found in cache and recent
-        return {
-            "method_used": "memory_cache",
-            "categorization": merchant_info,
-            "confidence": merchant_info["confidence"],
-            "final_category": merchant_info["category"],
-            "memory_updated": False,
-            "messages": [HumanMessage(content=f"Found in cache: {merchant_info['category']}")],
-        }
-    
-    # Not in cache or outdated - need to research
-    return {
-        "method_used": "needs_research",
-        "messages": [HumanMessage(content=f"Not in cache, researching: {merchant_name}")],
-    }
+# One pooled HTTP client per event loop, shared by every categorizer so the
+# OpenAI calls reuse connections instead of opening a new TLS session each time
+_HTTP_CLIENTS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
 
 
-async def research_node(state: TransactionCategorizationState, config: RunnableConfig) -> Dict:
+def get_http_client() -> httpx.AsyncClient:
+    """Return the HTTP client shared on the running event loop, creating it on first use"""
+    loop = asyncio.get_running_loop()
+    client = _HTTP_CLIENTS.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            http2=HTTP2_AVAILABLE,
+            timeout=60,
+            limits=httpx.Limits(max_connections=64, max_keepalive_connections=32)
+        )
+        _HTTP_CLIENTS[loop] = client
+    return client
+
+
+async def close_http_client():
+    """Close the HTTP client shared on the running event loop"""
+    client = _HTTP_CLIENTS.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+# ==================== Research Helpers ====================
+
+VALID_CATEGORIES = [
+    "Income", "Savings", "Taxes", "Transfers", "Internal Transfer",
+    "Donations", "Loan", "ATM", "Groceries", "Food & Dining",
+    "Transportation", "Shopping", "Entertainment", "Healthcare",
+    "Utilities", "Services", "Education", "Tech & Software",
+    "Sports", "Vending", "Housing", "Fees", "Other"
+]
+
+
+def search_merchant(merchant_name: str) -> List[Dict]:
     """
-    Research unknown merchants using web search and LLM
+    Search the web for a merchant (Tavily). Returns an empty list on error
     """
-    merchant_name = state.get("merchant_name", "")
-    amount = state.get("amount", 0)
-    
-    # Initialize LLM
-    llm = ChatOpenAI(
-        model="gpt-4o-mini",
-        temperature=0.1,
-        api_key=os.getenv("OPENAI_API_KEY")
-    )
-    
-    # Try web search first
     search_results = []
     try:
         search_tool = TavilySearchResults(
@@ -162,7 +171,13 @@ async def research_node(state: TransactionCategorizationState, config: RunnableC
             search_results = results.get("results", [])
     except Exception as e:
         print(f"Search error: {e}")
-    
+    return search_results
+
+
+def build_research_prompt(merchant_name: str, amount: float, search_results: List[Dict]) -> str:
+    """
+    Build the categorization prompt for a merchant and its search results
+    """
     # Format search results for LLM
     search_context = ""
     if search_results:
@@ -172,8 +187,7 @@ async def research_node(state: TransactionCategorizationState, config: RunnableC
                 search_context += f"Title: {result.get('title', '')}\n"
                 search_context += f"Content: {result.get('content', '')[:200]}\n"
     
-    # Analyze with LLM
-    prompt = f"""
+    return f"""
     You are a financial transaction categorizer for Spanish bank statements.
     
     MERCHANT: {merchant_name}
@@ -203,41 +217,95 @@ async def research_node(state: TransactionCategorizationState, config: RunnableC
         "reasoning": "brief explanation"
     }}
     """
+
+
+def parse_analysis(content: str) -> Dict:
+    """
+    Parse the LLM JSON answer, resetting unknown categories to "Other"
+    """
+    # Clean response
+    if "```json" in content:
+        content = content.split("```json")[1].split("```")[0]
+    elif "```" in content:
+        content = content.split("```")[1].split("```")[0]
+    
+    analysis = json.loads(content.strip())
+    
+    if analysis.get("category") not in VALID_CATEGORIES:
+        analysis["category"] = "Other"
+        analysis["confidence"] = 0.3
+    return analysis
+
+
+def fallback_analysis() -> Dict:
+    """Analysis used when the LLM answer is missing or invalid"""
+    return {
+        "category": "Other",
+        "confidence": 0.2,
+        "business_type": "Unknown",
+        "reasoning": "Could not determine category"
+    }
+
+
+# ==================== Agent Nodes ====================
+
+async def check_memory_node(state: TransactionCategorizationState, config: RunnableConfig) -> Dict:
+    """
+    Check if merchant exists in memory cache
+    """
+    merchant_name = state.get("merchant_name", "")
+    
+    # Initialize memory
+    memory = MerchantMemory(config.get("configurable", {}).get("cache_file", "data/merchant_cache.json"))
+    merchant_info = memory.get_merchant(merchant_name)
+    
+    if merchant_info and memory.is_recent(merchant_info):
+        # Found in cache and recent
+        return {
+            "method_used": "memory_cache",
+            "categorization": merchant_info,
+            "confidence": merchant_info["confidence"],
+            "final_category": merchant_info["category"],
+            "memory_updated": False,
+            "messages": [HumanMessage(content=f"Found in cache: {merchant_info['category']}")],
+        }
+    
+    # Not in cache or outdated - need to research
+    return {
+        "method_used": "needs_research",
+        "messages": [HumanMessage(content=f"Not in cache, researching: {merchant_name}")],
+    }
+
+
+async def research_node(state: TransactionCategorizationState, config: RunnableConfig) -> Dict:
+    """
+    Research unknown merchants using web search and LLM
+    """
+    merchant_name = state.get("merchant_name", "")
+    amount = state.get("amount", 0)
+    
+    # Initialize LLM
+    llm = ChatOpenAI(
+        model="gpt-4o-mini",
+        temperature=0.1,
+        api_key=os.getenv("OPENAI_API_KEY"),
+        http_async_client=config.get("configurable", {}).get("http_client")
+    )
+    
+    # Try web search first
+    search_results = search_merchant(merchant_name)
+    
+    # Analyze with LLM
+    prompt = build_research_prompt(merchant_name, amount, search_results)
     
     try:
         response = await llm.ainvoke([HumanMessage(content=prompt)])
-        content = response.content
-        
-        # Clean response
-        if "```json" in content:
-            content = content.split("```json")[1].split("```")[0]
-        elif "```" in content:
-            content = content.split("```")[1].split("```")[0]
-        
-        analysis = json.loads(content.strip())
-        
-        # Validate category
-        valid_categories = [
-            "Income", "Savings", "Taxes", "Transfers", "Internal Transfer",
-            "Donations", "Loan", "ATM", "Groceries", "Food & Dining",
-            "Transportation", "Shopping", "Entertainment", "Healthcare",
-            "Utilities", "Services", "Education", "Tech & Software",
-            "Sports", "Vending", "Housing", "Fees", "Other"
-        ]
-        
-        if analysis.get("category") not in valid_categories:
-            analysis["category"] = "Other"
-            analysis["confidence"] = 0.3
+        analysis = parse_analysis(response.content)
         
     except Exception as e:
         print(f"LLM error: {e}")
         # Fallback categorization
-        analysis = {
-            "category": "Other",
-            "confidence": 0.2,
-            "business_type": "Unknown",
-            "reasoning": "Could not determine category"
-        }
+        analysis = fallback_analysis()
     
     # Save to memory if confidence is high enough
     if analysis["confidence"] > 0.6:
@@ -332,20 +400,30 @@ def create_categorization_graph():
 
 # ==================== Main Integration ====================
 
+def memo_key(transaction: Dict) -> tuple:
+    """In-process memo key: normalized description plus the sign of the amount"""
+    description = re.sub(r'\s+', ' ', str(transaction.get("description", "")).upper().strip())
+    return description, 1 if (transaction.get("amount") or 0) >= 0 else -1
+
+
 class SimplifiedMultiAgentCategorizer:
     """
     Simplified multi-agent categorizer for "Other" transactions only
     """
     
-    def __init__(self, cache_file: str = "data/merchant_cache.json"):
+    def __init__(self, cache_file: str = "data/merchant_cache.json", http_client: Optional[httpx.AsyncClient] = None):
         self.graph = create_categorization_graph()
         self.cache_file = cache_file
+        # Defaults to the client shared on the running event loop
+        self.http_client = http_client
         self.stats = {
             "total": 0,
             "memory_cache": 0,
             "web_research_llm": 0,
             "failed": 0
         }
+        # Results already computed in this run, so recurring merchants skip the graph
+        self._mem: Dict[tuple, Dict] = {}
     
     async def categorize_transaction(self, transaction: Dict) -> Dict:
         """
@@ -360,6 +438,12 @@ class SimplifiedMultiAgentCategorizer:
                 "method": "already_categorized"
             }
         
+        key = memo_key(transaction)
+        if key in self._mem:
+            self.stats["memory_inproc"] = self.stats.get("memory_inproc", 0) + 1
+            self.stats["total"] += 1
+            return {**self._mem[key], "transaction": transaction, "method": "memory_inproc"}
+        
         # Prepare state
         initial_state = {
             "transaction": transaction,
@@ -373,7 +457,8 @@ class SimplifiedMultiAgentCategorizer:
         config = {
             "configurable": {
                 "thread_id": str(uuid.uuid4()),
-                "cache_file": self.cache_file
+                "cache_file": self.cache_file,
+                "http_client": self.http_client or get_http_client()
             }
         }
         
@@ -385,13 +470,15 @@ class SimplifiedMultiAgentCategorizer:
             self.stats[method] = self.stats.get(method, 0) + 1
             self.stats["total"] += 1
             
-            return {
+            categorized = {
                 "transaction": transaction,
                 "category": result.get("final_category", "Other"),
                 "confidence": result.get("confidence", 0),
                 "method": method,
                 "memory_updated": result.get("memory_updated", False)
             }
+            self._mem[key] = categorized
+            return dict(categorized)
         
         except Exception as e:
             print(f"Error categorizing: {e}")
@@ -443,16 +530,170 @@ class SimplifiedMultiAgentCategorizer:
         print("📊 Processing Summary:")
         print(f"  Total processed: {self.stats['total']}")
         print(f"  From cache: {self.stats.get('memory_cache', 0)}")
+        print(f"  Repeated in this run: {self.stats.get('memory_inproc', 0)}")
         print(f"  Web research + LLM: {self.stats.get('web_research_llm', 0)}")
         print(f"  Failed: {self.stats.get('failed', 0)}")
         
         return transactions
     
+    async def process_batch_offline(
+        self,
+        transactions: List[Dict],
+        model: str = "gpt-4o-mini",
+        poll_interval: float = 30.0
+    ) -> List[Dict]:
+        """
+        Categorize "Other" transactions through the OpenAI Batch API.
+        
+        Cached merchants are resolved locally; the rest are sent as one
+        batch job (JSONL of chat completions) instead of one live call each,
+        which halves token cost for non-interactive runs. Results go through
+        the same validation and memory update as the live graph.
+        
+        Returns:
+            One result per "Other" transaction (same shape as
+            categorize_transaction); the transactions are updated in place
+        """
+        others = [t for t in transactions if t.get("category") in ["Other", None, ""]]
+        if not others:
+            print("✅ No 'Other' transactions to process")
+            return []
+        
+        memory = MerchantMemory(self.cache_file)
+        analyses: Dict[int, Dict] = {}
+        methods: Dict[int, str] = {}
+        pending = []
+        
+        for idx, transaction in enumerate(others):
+            merchant_info = memory.get_merchant(transaction.get("description", ""))
+            if merchant_info and memory.is_recent(merchant_info):
+                analyses[idx] = merchant_info
+                methods[idx] = "memory_cache"
+            else:
+                pending.append(idx)
+        
+        if pending:
+            print(f"📦 Submitting {len(pending)} transactions to the Batch API...")
+            
+            # Web searches run concurrently; only the LLM step is batched
+            searches = await asyncio.gather(*(
+                asyncio.to_thread(search_merchant, others[idx].get("description", ""))
+                for idx in pending
+            ))
+            
+            lines = []
+            for idx, search_results in zip(pending, searches):
+                transaction = others[idx]
+                prompt = build_research_prompt(
+                    transaction.get("description", ""),
+                    transaction.get("amount", 0),
+                    search_results
+                )
+                lines.append(json.dumps({
+                    "custom_id": str(idx),
+                    "method": "POST",
+                    "url": "/v1/chat/completions",
+                    "body": {
+                        "model": model,
+                        "temperature": 0.1,
+                        "messages": [{"role": "user", "content": prompt}]
+                    }
+                }, ensure_ascii=False))
+            
+            answers = await self._run_batch_job("\n".join(lines), poll_interval)
+            
+            for idx in pending:
+                try:
+                    analysis = parse_analysis(answers[str(idx)])
+                except Exception as e:
+                    print(f"Batch result error ({others[idx].get('description', '')}): {e}")
+                    analysis = fallback_analysis()
+                
+                if analysis["confidence"] > 0.6:
+                    memory.remember_merchant(others[idx].get("description", ""), analysis)
+                analyses[idx] = analysis
+                methods[idx] = "batch_llm"
+        
+        results = []
+        for idx, transaction in enumerate(others):
+            analysis = analyses[idx]
+            validated = await validation_node({
+                "final_category": analysis["category"],
+                "confidence": analysis.get("confidence", 0.5),
+                "amount": transaction.get("amount", 0),
+                "merchant_name": transaction.get("description", "")
+            })
+            
+            method = methods[idx]
+            self.stats[method] = self.stats.get(method, 0) + 1
+            self.stats["total"] += 1
+            
+            result = {
+                "transaction": transaction,
+                "category": validated["final_category"],
+                "confidence": validated["confidence"],
+                "method": method
+            }
+            results.append(result)
+            
+            # Update original transaction
+            if result["category"] != "Other" and result["confidence"] > 0.5:
+                transaction["category"] = result["category"]
+                transaction["category_confidence"] = result["confidence"]
+                transaction["category_method"] = f"multiagent_{method}"
+        
+        return results
+    
+    async def _run_batch_job(self, requests_jsonl: str, poll_interval: float) -> Dict[str, str]:
+        """
+        Upload a JSONL request file, wait for the batch and return
+        {custom_id: message content} for the requests that succeeded
+        """
+        client = AsyncOpenAI(
+            api_key=os.getenv("OPENAI_API_KEY"),
+            http_client=self.http_client or get_http_client()
+        )
+        batch_file = await client.files.create(
+            file=("categorization_batch.jsonl", requests_jsonl.encode("utf-8")),
+            purpose="batch"
+        )
+        batch = await client.batches.create(
+            input_file_id=batch_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h"
+        )
+        
+        while batch.status not in ("completed", "failed", "expired", "cancelled"):
+            await asyncio.sleep(poll_interval)
+            batch = await client.batches.retrieve(batch.id)
+            print(f"  Batch {batch.id}: {batch.status}")
+        
+        if not batch.output_file_id:
+            print(f"❌ Batch {batch.id} finished without output ({batch.status})")
+            return {}
+        
+        output = await client.files.content(batch.output_file_id)
+        answers = {}
+        for line in output.text.splitlines():
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            response = record.get("response") or {}
+            if response.get("status_code") == 200:
+                answers[record["custom_id"]] = response["body"]["choices"][0]["message"]["content"]
+        return answers
+    
     def process_batch(self, transactions: List[Dict]) -> List[Dict]:
         """
         Synchronous wrapper for pipeline integration
         """
-        return asyncio.run(self.process_others_only(transactions))
+        async def run():
+            try:
+                return await self.process_others_only(transactions)
+            finally:
+                await close_http_client()
+        
+        return asyncio.run(run())
 
 
 # ==================== Example Usage ====================
@@ -482,6 +723,7 @@ async def main():
     
     categorizer = SimplifiedMultiAgentCategorizer()
     results = await categorizer.process_others_only(test_transactions)
+    await close_http_client()
     
     print("\n✅ Final Results:")
     for t in results:
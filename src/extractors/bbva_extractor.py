@@ -12,6 +12,12 @@ import re
 import logging
 import os
 
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -103,6 +109,21 @@ class BBVAExtractor:
             'Internal Transfer': r'(?i)(traspaso programa tu cuenta|traspaso cuenta)',
             'Vending': r'(?i)(vending|maquina)'
         }
+        # Compiled once; categorization runs these for every row
+        self._category_regexes = {
+            category: re.compile(pattern) for category, pattern in self.category_patterns.items()
+        }
+
+        # Aho-Corasick automaton over concept keywords: one pass over the
+        # description instead of one substring search per keyword.
+        # Values carry the keyword's position so the earliest keyword in
+        # concept_keywords still wins, as in the plain loop.
+        self._concept_automaton = None
+        if AHOCORASICK_AVAILABLE:
+            self._concept_automaton = ahocorasick.Automaton()
+            for priority, (keyword, category) in enumerate(self.concept_keywords.items()):
+                self._concept_automaton.add_word(keyword.lower(), (priority, category))
+            self._concept_automaton.make_automaton()
     
     def extract(self, file_path: Union[str, Path], use_gpt: bool = False, gpt_api_key: Optional[str] = None, use_gpt5: bool = True) -> Dict:
         """
@@ -335,16 +356,16 @@ class BBVAExtractor:
         stats = self._calculate_statistics(df)
         
         # Prepare output
+        # Format dates as strings for JSON serialization (mantener formato español)
+        # in one column operation, and add concept field for compatibility
         transactions = df[[
             'date', 'value_date', 'description', 'description_clean',
             'amount', 'currency', 'category', 'bbva_category', 'notes'
-        ]].to_dict('records')
-        
-        # Format dates as strings for JSON serialization (mantener formato español)
-        for t in transactions:
-            t['date'] = t['date'].strftime('%d/%m/%Y')  # Formato español
-            t['value_date'] = t['value_date'].strftime('%d/%m/%Y')  # Formato español
-            t['concept'] = t['description']  # Add concept field for compatibility
+        ]].assign(
+            date=df['date'].dt.strftime('%d/%m/%Y'),  # Formato español
+            value_date=df['value_date'].dt.strftime('%d/%m/%Y'),  # Formato español
+            concept=df['description']
+        ).to_dict('records')
         
         return {
             'transactions': transactions,
@@ -399,9 +420,9 @@ class BBVAExtractor:
             return 'Income'
         
         # 2. Check concept keywords (most reliable)
-        for keyword, category in self.concept_keywords.items():
-            if keyword in description_lower:
-                return category
+        category = self._match_concept_keyword(description_lower)
+        if category:
+            return category
         
         # 3. Check if it's income (positive amount and not a refund)
         if amount > 0 and 'devolucion' not in description_lower:
@@ -409,13 +430,24 @@ class BBVAExtractor:
         
         # 4. Pattern matching on description for merchants
         description_clean_lower = row['description_clean'].lower() if pd.notna(row['description_clean']) else ''
-        for category, pattern in self.category_patterns.items():
-            if re.search(pattern, description_clean_lower):
+        for category, regex in self._category_regexes.items():
+            if regex.search(description_clean_lower):
                 return category
         
         # 5. Default category
         return 'Other'
     
+    def _match_concept_keyword(self, description_lower: str) -> Optional[str]:
+        """Return the category of the first concept keyword found in the description"""
+        if self._concept_automaton is not None:
+            matches = [value for _, value in self._concept_automaton.iter(description_lower)]
+            return min(matches)[1] if matches else None
+
+        for keyword, category in self.concept_keywords.items():
+            if keyword in description_lower:
+                return category
+        return None
+
     def categorize_with_gpt(self, df: pd.DataFrame, api_key: Optional[str] = None, use_gpt5: bool = True) -> pd.DataFrame:
         """
         Use GPT-5-nano or GPT-4o for intelligent categorization of transactions.
@@ -16,6 +16,10 @@ Fecha: Enero 2025
 import re
 import json
 import logging
+import functools
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from typing import Dict, List, Tuple, Optional, Any
 from dataclasses import dataclass, field
 from datetime import datetime
@@ -26,10 +30,124 @@ from presidio_analyzer.nlp_engine import NlpEngineProvider
 from presidio_anonymizer import AnonymizerEngine, OperatorConfig
 from presidio_anonymizer.entities import OperatorResult
 
+try:
+    from pattern_db import compile_scanner, load_patterns_db
+    from validators import _STRIP_WS, _STRIP_WS_DASH, validate_dni, validate_iban, validate_luhn
+except ImportError:
+    from .pattern_db import compile_scanner, load_patterns_db
+    from .validators import _STRIP_WS, _STRIP_WS_DASH, validate_dni, validate_iban, validate_luhn
+
+# xxhash es opcional: etiquetas hash más rápidas que MD5 (no criptográficas)
+try:
+    import xxhash
+    XXHASH_AVAILABLE = True
+except ImportError:
+    import hashlib
+    XXHASH_AVAILABLE = False
+
+# RE2 es opcional: motor de tiempo lineal (sin backtracking) con la misma
+# API que `re`; los flags se expresan en línea ((?i)) para ser compatibles
+try:
+    import re2 as regex_engine
+    RE2_AVAILABLE = True
+except ImportError:
+    regex_engine = re
+    RE2_AVAILABLE = False
+
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Literal obligatorio (en minúsculas) de cada tipo: si no aparece en el
+# texto se evita lanzar su regex (`in` es mucho más barato que finditer)
+_REQUIRED_LITERALS = {
+    'ES_IBAN': 'es',
+    'TRANSFER_REF': 'ref',
+}
+
+# Sustituciones de _extract_pattern (dígitos y letras por clases)
+_DIGIT_RE = re.compile(r'\d')
+_UPPER_RE = re.compile(r'[A-Z]')
+_LOWER_RE = re.compile(r'[a-z]')
+
+# Entrada de _confidence_index para tipos sin patrón estático
+_NO_CONFIDENCE_INFO = (0.5, None, (), None)
+
+
+# ==================== Estrategias de reemplazo ====================
+
+def _hash_tag(text: str) -> str:
+    """
+    Hash determinístico corto (8 hex) para el método de anonimización 'hash'.
+    
+    No se memoiza: una caché conservaría los datos personales en claro en
+    memoria durante toda la vida del proceso, y el hash ya es barato.
+    """
+    if XXHASH_AVAILABLE:
+        return xxhash.xxh3_64_hexdigest(text.encode())[:8]
+    return hashlib.md5(text.encode()).hexdigest()[:8]
+
+
+def _mask_card(text: str) -> str:
+    """Mostrar solo los últimos 4 dígitos de la tarjeta"""
+    digits = text.translate(_STRIP_WS_DASH)
+    if len(digits) >= 4:
+        return f"****-****-****-{digits[-4:]}"
+    return "****-****-****-****"
+
+
+def _mask_dni(text: str) -> str:
+    """Ocultar el DNI completo manteniendo su longitud"""
+    return "********X"
+
+
+def _mask_phone(text: str) -> str:
+    """Ocultar el teléfono manteniendo el prefijo internacional"""
+    if text.startswith('+34'):
+        return "+34 *** ** ** **"
+    return "*** ** ** **"
+
+
+def _mask_iban(text: str) -> str:
+    """Mostrar país y últimos 4 dígitos del IBAN"""
+    clean = text.translate(_STRIP_WS)
+    if len(clean) >= 6:
+        return f"{clean[:4]}...{clean[-4:]}"
+    return "ES**...****"
+
+
+# Máscaras que mantienen el formato; el resto de tipos usa la etiqueta
+_MASK_HANDLERS = {
+    'CREDIT_CARD': _mask_card,
+    'ES_DNI': _mask_dni,
+    'ES_PHONE': _mask_phone,
+    'ES_IBAN': _mask_iban,
+}
+
+
+def _replace_mask(entity_type: str, text: str) -> str:
+    """Mantener formato pero ocultar caracteres"""
+    handler = _MASK_HANDLERS.get(entity_type)
+    return handler(text) if handler else f"<{entity_type}>"
+
+
+def _replace_label(entity_type: str, text: str) -> str:
+    """Reemplazar con etiqueta descriptiva"""
+    return f"<{entity_type}>"
+
+
+def _replace_hash(entity_type: str, text: str) -> str:
+    """Etiqueta con hash determinístico para consistencia"""
+    return f"<{entity_type}_{_hash_tag(text)}>"
+
+
+# Método de anonimización -> función (entity_type, texto) -> reemplazo
+_REPLACEMENT_METHODS = {
+    'mask': _replace_mask,
+    'replace': _replace_label,
+    'hash': _replace_hash,
+}
+
 
 @dataclass
 class AnonymizationResult:
@@ -47,37 +165,172 @@ class AnonymizationResult:
 class SpanishFinancialPatterns:
     """Patrones específicos para datos financieros españoles"""
     
-    # DNI: 8 dígitos + letra
-    DNI_PATTERN = r'\b\d{8}[A-HJ-NP-TV-Z]\b'
+    # DNI: 8 dígitos + letra de control
+    DNI_PATTERN = r'\b\d{8}[TRWAGMYFPDXBNJZSQVHLCKE]\b'
+    DNI_RE = regex_engine.compile(DNI_PATTERN)
     DNI_CONTEXT = ['dni', 'documento', 'identidad', 'nif']
     
-    # NIE: X/Y/Z + 7 dígitos + letra
-    NIE_PATTERN = r'\b[XYZ]\d{7}[A-Z]\b'
+    # NIE: X/Y/Z + 7 dígitos + letra de control
+    NIE_PATTERN = r'\b[XYZ]\d{7}[TRWAGMYFPDXBNJZSQVHLCKE]\b'
+    NIE_RE = regex_engine.compile(NIE_PATTERN)
     NIE_CONTEXT = ['nie', 'extranjero', 'residencia']
     
-    # CIF/NIF empresarial: letra + 8 dígitos
-    CIF_PATTERN = r'\b[ABCDEFGHJKLMNPQRSUVW]\d{8}\b'
+    # CIF/NIF empresarial: letra + 7 dígitos + control (dígito o letra A-J)
+    CIF_PATTERN = r'\b[ABCDEFGHJKLMNPQRSUVW]\d{7}[0-9A-J]\b'
+    CIF_RE = regex_engine.compile(CIF_PATTERN)
     CIF_CONTEXT = ['cif', 'empresa', 'sociedad', 'fiscal']
     
     # IBAN español: ES + 22 dígitos
     IBAN_ES_PATTERN = r'\bES\d{2}\s?\d{4}\s?\d{4}\s?\d{2}\s?\d{10}\b'
+    IBAN_ES_RE = regex_engine.compile(IBAN_ES_PATTERN)
     IBAN_CONTEXT = ['iban', 'cuenta', 'bancaria', 'transferencia']
     
     # Tarjetas de crédito (con espacios o guiones)
     CARD_PATTERN = r'\b(?:\d{4}[\s-]?){3}\d{4}\b'
+    CARD_RE = regex_engine.compile(CARD_PATTERN)
     CARD_CONTEXT = ['tarjeta', 'visa', 'mastercard', 'credito', 'debito']
     
     # Teléfonos españoles
     PHONE_ES_PATTERN = r'\b(?:(?:\+34|0034)?[\s-]?)?[6789]\d{2}[\s-]?\d{2}[\s-]?\d{2}[\s-]?\d{2}\b'
+    PHONE_ES_RE = regex_engine.compile(PHONE_ES_PATTERN)
     PHONE_CONTEXT = ['telefono', 'movil', 'contacto', 'whatsapp']
     
     # Códigos de comercio BBVA
     MERCHANT_CODE_PATTERN = r'\b[A-Z]{3}\d{6}\b'
+    MERCHANT_CODE_RE = regex_engine.compile(MERCHANT_CODE_PATTERN)
     MERCHANT_CONTEXT = ['comercio', 'establecimiento', 'merchant', 'tpv']
     
-    # Referencias de transferencia
-    TRANSFER_REF_PATTERN = r'\b(?:REF|ref)[:\s]?[A-Z0-9]{8,16}\b'
+    # Referencias de transferencia (siempre se compila sin distinguir mayúsculas)
+    TRANSFER_REF_PATTERN = r'\bREF[:\s]?[A-Z0-9]{8,16}\b'
+    TRANSFER_REF_RE = regex_engine.compile('(?i)' + TRANSFER_REF_PATTERN)
     TRANSFER_CONTEXT = ['referencia', 'transferencia', 'operacion']
+    
+    # Tipos de `scan`: (tipo, patrón, insensible a mayúsculas); cada tipo
+    # tiene su regex en el atributo <tipo>_RE
+    SCAN_PATTERNS = (
+        ('IBAN_ES', IBAN_ES_PATTERN, False),
+        ('CARD', CARD_PATTERN, False),
+        ('DNI', DNI_PATTERN, False),
+        ('NIE', NIE_PATTERN, False),
+        ('CIF', CIF_PATTERN, False),
+        ('PHONE_ES', PHONE_ES_PATTERN, False),
+        ('MERCHANT_CODE', MERCHANT_CODE_PATTERN, False),
+        ('TRANSFER_REF', TRANSFER_REF_PATTERN, True),
+    )
+    
+    # Escáner Hyperscan compartido (None: sin compilar; False: no disponible)
+    _scanner = None
+    
+    @classmethod
+    def scan(cls, text: str) -> List[Tuple[str, int, int]]:
+        """
+        Busca todos los tipos de entidad con un único escaneo Hyperscan;
+        sin Hyperscan recorre cada patrón con el motor regex.
+        
+        Devuelve todas las coincidencias de cada tipo aunque se solapen
+        con las de otro.
+        
+        Returns:
+            Lista de (tipo, inicio, fin) ordenada por posición
+        """
+        if cls._scanner is None:
+            cls._scanner = compile_scanner(cls.SCAN_PATTERNS) or False
+        if cls._scanner:
+            return cls._scanner.scan(text)
+        
+        matches = [
+            (entity_type, match.start(), match.end())
+            for entity_type, _, _ in cls.SCAN_PATTERNS
+            for match in getattr(cls, f'{entity_type}_RE').finditer(text)
+        ]
+        matches.sort(key=lambda match: (match[1], match[2]))
+        return matches
+
+
+# Modelos spaCy usados por Presidio: (lang_code, model_name)
+PRESIDIO_MODELS = (
+    ("es", "es_core_news_sm"),
+    ("en", "en_core_web_sm"),
+)
+
+# Componentes de spaCy que Presidio no usa. Se mantienen tagger/morphologizer,
+# attribute_ruler y lemmatizer: el potenciador de contexto compara lemas.
+PRESIDIO_DISABLED_PIPES = ('parser',)
+
+
+@functools.lru_cache(maxsize=4)
+def _build_presidio(
+    models: Tuple[Tuple[str, str], ...],
+    recognizers: Tuple[Tuple[str, str, float, Tuple[str, ...]], ...]
+) -> Tuple[AnalyzerEngine, AnonymizerEngine]:
+    """
+    Construye (y cachea) el analyzer y anonymizer de Presidio.
+    
+    Cargar los modelos de spaCy cuesta segundos, así que las instancias
+    con la misma configuración comparten los motores ya inicializados.
+    
+    Args:
+        models: Pares (lang_code, model_name) para el NLP engine
+        recognizers: Tuplas (entity_type, regex, score, context) de reconocedores
+        
+    Returns:
+        Tupla (AnalyzerEngine, AnonymizerEngine)
+    """
+    # Configurar NLP engine para español
+    configuration = {
+        "nlp_engine_name": "spacy",
+        "models": [
+            {"lang_code": lang_code, "model_name": model_name}
+            for lang_code, model_name in models
+        ]
+    }
+    
+    try:
+        provider = NlpEngineProvider(nlp_configuration=configuration)
+        nlp_engine = provider.create_engine()
+    except:
+        logger.warning("No se pudo cargar modelo de spaCy español, usando inglés")
+        nlp_engine = None
+    
+    # Los modelos se cargan aquí y todavía no se comparten: desactivarlos
+    # una sola vez evita modificar el pipeline durante cada análisis
+    if nlp_engine:
+        for pipeline in getattr(nlp_engine, 'nlp', {}).values():
+            for name in PRESIDIO_DISABLED_PIPES:
+                if name in pipeline.pipe_names:
+                    pipeline.disable_pipe(name)
+    
+    # Crear registry con reconocedores personalizados
+    registry = RecognizerRegistry()
+    registry.load_predefined_recognizers()
+    
+    # Añadir reconocedores españoles
+    for entity_type, regex, score, context in recognizers:
+        pattern = Pattern(
+            name=f"{entity_type}_pattern",
+            regex=regex,
+            score=score
+        )
+        
+        recognizer = PatternRecognizer(
+            supported_entity=entity_type,
+            patterns=[pattern],
+            context=list(context)
+        )
+        
+        registry.add_recognizer(recognizer)
+    
+    # Crear analyzer
+    if nlp_engine:
+        analyzer = AnalyzerEngine(
+            nlp_engine=nlp_engine,
+            registry=registry,
+            supported_languages=[lang_code for lang_code, _ in models]
+        )
+    else:
+        analyzer = AnalyzerEngine(registry=registry)
+    
+    return analyzer, AnonymizerEngine()
 
 
 class AdaptiveAnonymizer:
@@ -86,6 +339,9 @@ class AdaptiveAnonymizer:
     Aprende de patrones nuevos y mejora con el tiempo.
     """
     
+    # Máximo de registros de estadísticas que se conservan en memoria
+    STATS_HISTORY_SIZE = 10000
+    
     def __init__(
         self, 
         patterns_file: str = "learned_patterns.json",
@@ -112,13 +368,20 @@ class AdaptiveAnonymizer:
         
         # Capa 1: Patrones estáticos (siempre habilitada)
         self.static_patterns = self._load_static_patterns()
+        self._compiled_patterns = {
+            entity_type: regex_engine.compile('(?i)' + config['pattern'])
+            for entity_type, config in self.static_patterns.items()
+        }
+        self._confidence_index = self._build_confidence_index()
         self.learned_patterns = self._load_learned_patterns()
         
+        # Prefiltro Hyperscan precompilado (None si no está disponible)
+        self.patterns_db = load_patterns_db(self.static_patterns)
+        
         # Capa 2: Presidio + spaCy (opcional)
         if enable_presidio:
             try:
-                self.analyzer = self._setup_presidio()
-                self.anonymizer = AnonymizerEngine()
+                self.analyzer, self.anonymizer = self._setup_presidio()
             except Exception as e:
                 logger.warning(f"No se pudo inicializar Presidio: {e}")
                 logger.warning("Continuando solo con reglas estáticas")
@@ -129,9 +392,9 @@ class AdaptiveAnonymizer:
             self.analyzer = None
             self.anonymizer = None
         
-        # Estadísticas para aprendizaje
-        self.processing_stats = []
-        self.uncertain_cases = []
+        # Estadísticas para aprendizaje (acotadas para procesos de larga duración)
+        self.processing_stats = deque(maxlen=self.STATS_HISTORY_SIZE)
+        self.uncertain_cases = deque(maxlen=self.STATS_HISTORY_SIZE)
         
     def _load_static_patterns(self) -> Dict[str, Dict]:
         """Carga patrones regex predefinidos"""
@@ -180,6 +443,26 @@ class AdaptiveAnonymizer:
             }
         }
     
+    def _build_confidence_index(self) -> Dict[str, Tuple]:
+        """
+        Aplana los patrones estáticos para el cálculo de confianza:
+        entity_type -> (confianza base, validador, palabras de contexto, regex de contexto)
+        """
+        index = {}
+        for entity_type, config in self.static_patterns.items():
+            context_words = tuple(config.get('context', []))
+            context_re = (
+                re.compile('|'.join(map(re.escape, context_words)))
+                if context_words else None
+            )
+            index[entity_type] = (
+                config.get('confidence', 0.5),
+                config.get('validator'),
+                context_words,
+                context_re
+            )
+        return index
+    
     def _load_learned_patterns(self) -> Dict:
         """Carga patrones aprendidos del archivo"""
         if self.patterns_file.exists():
@@ -187,136 +470,59 @@ class AdaptiveAnonymizer:
                 return json.load(f)
         return {}
     
-    def _setup_presidio(self) -> AnalyzerEngine:
+    def _setup_presidio(self) -> Tuple[AnalyzerEngine, AnonymizerEngine]:
         """Configura Presidio con reconocedores personalizados para España"""
+        recognizers = tuple(
+            (entity_type, config['pattern'], config['confidence'], tuple(config.get('context', [])))
+            for entity_type, config in self.static_patterns.items()
+        )
+        return _build_presidio(PRESIDIO_MODELS, recognizers)
+    
+    # Validadores de dígito de control (memorizados en validators.py)
+    _validate_credit_card = staticmethod(validate_luhn)
+    _validate_spanish_dni = staticmethod(validate_dni)
+    _validate_iban = staticmethod(validate_iban)
+    
+    def _calculate_confidence(
+        self, text: str, entity_type: str, match: str, text_lower: Optional[str] = None
+    ) -> float:
+        """
+        Calcula confianza basada en contexto y validación.
         
-        # Configurar NLP engine para español
-        configuration = {
-            "nlp_engine_name": "spacy",
-            "models": [
-                {"lang_code": "es", "model_name": "es_core_news_sm"},
-                {"lang_code": "en", "model_name": "en_core_web_sm"}
-            ]
-        }
-        
-        try:
-            provider = NlpEngineProvider(nlp_configuration=configuration)
-            nlp_engine = provider.create_engine()
-        except:
-            logger.warning("No se pudo cargar modelo de spaCy español, usando inglés")
-            nlp_engine = None
-        
-        # Crear registry con reconocedores personalizados
-        registry = RecognizerRegistry()
-        registry.load_predefined_recognizers()
-        
-        # Añadir reconocedores españoles
-        for entity_type, config in self.static_patterns.items():
-            pattern = Pattern(
-                name=f"{entity_type}_pattern",
-                regex=config['pattern'],
-                score=config['confidence']
-            )
-            
-            recognizer = PatternRecognizer(
-                supported_entity=entity_type,
-                patterns=[pattern],
-                context=config.get('context', [])
-            )
-            
-            registry.add_recognizer(recognizer)
-        
-        # Crear analyzer
-        if nlp_engine:
-            analyzer = AnalyzerEngine(
-                nlp_engine=nlp_engine,
-                registry=registry,
-                supported_languages=["es", "en"]
-            )
-        else:
-            analyzer = AnalyzerEngine(registry=registry)
-        
-        return analyzer
-    
-    def _validate_credit_card(self, number: str) -> bool:
-        """Valida número de tarjeta con algoritmo de Luhn"""
-        # Eliminar espacios y guiones
-        number = re.sub(r'[\s-]', '', number)
-        
-        if not number.isdigit() or len(number) < 12 or len(number) > 19:
-            return False
-        
-        # Algoritmo de Luhn
-        digits = [int(d) for d in number]
-        checksum = 0
-        
-        for i in range(len(digits) - 2, -1, -2):
-            digits[i] *= 2
-            if digits[i] > 9:
-                digits[i] -= 9
-        
-        return sum(digits) % 10 == 0
-    
-    def _validate_spanish_dni(self, dni: str) -> bool:
-        """Valida DNI español con letra de control"""
-        dni_letters = "TRWAGMYFPDXBNJZSQVHLCKE"
-        
-        if len(dni) != 9:
-            return False
-        
-        try:
-            number = int(dni[:8])
-            letter = dni[8].upper()
-            return dni_letters[number % 23] == letter
-        except:
-            return False
-    
-    def _validate_iban(self, iban: str) -> bool:
-        """Valida IBAN con checksum"""
-        # Eliminar espacios
-        iban = re.sub(r'\s', '', iban)
-        
-        if not re.match(r'^[A-Z]{2}\d{2}[A-Z0-9]+$', iban):
-            return False
+        `text_lower` permite reutilizar el texto ya en minúsculas cuando se
+        puntúan varias coincidencias del mismo texto.
+        """
+        base_confidence, validation_bonus = self._match_confidence(entity_type, match)
+        _, _, context_words, context_re = self._confidence_index.get(entity_type, _NO_CONFIDENCE_INFO)
         
-        # Mover primeros 4 caracteres al final
-        rearranged = iban[4:] + iban[:4]
+        # Bonus por contexto (una búsqueda regex descarta el caso sin contexto)
+        if text_lower is None:
+            text_lower = text.lower()
+        context_bonus = 0.0
         
-        # Convertir letras a números (A=10, B=11, etc.)
-        numeric = ''
-        for char in rearranged:
-            if char.isdigit():
-                numeric += char
-            else:
-                numeric += str(ord(char) - ord('A') + 10)
+        if context_re is not None and context_re.search(text_lower):
+            for word in context_words:
+                if word in text_lower:
+                    # Bonus mayor si la palabra está cerca
+                    distance = abs(text_lower.find(word) - text_lower.find(match.lower()))
+                    if distance < 20:
+                        context_bonus = 0.2
+                    elif distance < 50:
+                        context_bonus = 0.1
+                    break
         
-        # Validar checksum
-        return int(numeric) % 97 == 1
+        return min(1.0, base_confidence + context_bonus + validation_bonus)
     
-    def _calculate_confidence(self, text: str, entity_type: str, match: str) -> float:
+    def _match_confidence(self, entity_type: str, match: str) -> Tuple[float, float]:
         """
-        Calcula confianza basada en contexto y validación.
+        Parte de la confianza que solo depende de la entidad (no del contexto):
+        confianza base del patrón y bonus/penalización por validación.
+        No se memoiza para no retener datos personales en claro en memoria.
         """
-        base_confidence = self.static_patterns.get(entity_type, {}).get('confidence', 0.5)
-        
-        # Bonus por contexto
-        context_words = self.static_patterns.get(entity_type, {}).get('context', [])
-        text_lower = text.lower()
-        context_bonus = 0.0
-        
-        for word in context_words:
-            if word in text_lower:
-                # Bonus mayor si la palabra está cerca
-                distance = abs(text_lower.find(word) - text_lower.find(match.lower()))
-                if distance < 20:
-                    context_bonus = 0.2
-                elif distance < 50:
-                    context_bonus = 0.1
-                break
+        base_confidence, validator, _, _ = self._confidence_index.get(entity_type, _NO_CONFIDENCE_INFO)
         
         # Bonus por validación
         validation_bonus = 0.0
-        validator = self.static_patterns.get(entity_type, {}).get('validator')
         
         if validator:
             if validator(match):
@@ -324,7 +530,7 @@ class AdaptiveAnonymizer:
             else:
                 validation_bonus = -0.3  # Penalización si falla validación
         
-        return min(1.0, base_confidence + context_bonus + validation_bonus)
+        return base_confidence, validation_bonus
     
     def analyze_with_static_rules(self, text: str) -> Tuple[List[Dict], float]:
         """
@@ -333,17 +539,25 @@ class AdaptiveAnonymizer:
         Returns:
             Lista de entidades encontradas y confianza promedio
         """
-        import time
         start = time.time()
         
         entities = []
         
-        for entity_type, config in self.static_patterns.items():
-            pattern = config['pattern']
-            matches = re.finditer(pattern, text, re.IGNORECASE)
+        # Un solo escaneo Hyperscan descarta los tipos que no aparecen;
+        # sin Hyperscan, un `in` sobre el literal obligatorio hace de filtro
+        candidates = self.patterns_db.candidate_types(text) if self.patterns_db else None
+        # Minúsculas una sola vez para el prefiltro y el contexto de todas las coincidencias
+        text_lower = text.lower()
+        
+        for entity_type, regex in self._compiled_patterns.items():
+            if candidates is not None:
+                if entity_type not in candidates:
+                    continue
+            elif entity_type in _REQUIRED_LITERALS and _REQUIRED_LITERALS[entity_type] not in text_lower:
+                continue
             
-            for match in matches:
-                confidence = self._calculate_confidence(text, entity_type, match.group())
+            for match in regex.finditer(text):
+                confidence = self._calculate_confidence(text, entity_type, match.group(), text_lower)
                 
                 entities.append({
                     'entity_type': entity_type,
@@ -371,7 +585,6 @@ class AdaptiveAnonymizer:
         Returns:
             Lista de entidades encontradas y confianza promedio
         """
-        import time
         start = time.time()
         
         try:
@@ -489,65 +702,28 @@ class AdaptiveAnonymizer:
         if not entities:
             return text
         
-        # Ordenar entidades por posición (de atrás hacia adelante)
-        entities.sort(key=lambda x: x['start'], reverse=True)
+        # Ordenar entidades por posición (ya vienen ordenadas de _remove_overlaps)
+        entities.sort(key=lambda x: x['start'])
         
-        anonymized = text
+        # Construir el resultado en una sola pasada: tramos de texto + reemplazos
+        parts = []
+        cursor = 0
         for entity in entities:
-            replacement = self._get_replacement(entity, method)
-            anonymized = (
-                anonymized[:entity['start']] + 
-                replacement + 
-                anonymized[entity['end']:]
-            )
+            if entity['start'] < cursor:
+                continue  # Solapada con una entidad ya reemplazada
+            parts.append(text[cursor:entity['start']])
+            parts.append(self._get_replacement(entity, method))
+            cursor = entity['end']
+        parts.append(text[cursor:])
         
-        return anonymized
+        return ''.join(parts)
     
     def _get_replacement(self, entity: Dict, method: str) -> str:
         """Genera el texto de reemplazo según el método"""
-        entity_type = entity['entity_type']
-        original_text = entity['text']
-        
-        if method == "mask":
-            # Mantener formato pero ocultar caracteres
-            if entity_type == 'CREDIT_CARD':
-                # Mostrar solo últimos 4 dígitos
-                digits = re.sub(r'[\s-]', '', original_text)
-                if len(digits) >= 4:
-                    return f"****-****-****-{digits[-4:]}"
-                return "****-****-****-****"
-            
-            elif entity_type == 'ES_DNI':
-                return "********X"
-            
-            elif entity_type == 'ES_PHONE':
-                # Mantener prefijo
-                if original_text.startswith('+34'):
-                    return "+34 *** ** ** **"
-                return "*** ** ** **"
-            
-            elif entity_type == 'ES_IBAN':
-                # Mostrar país y últimos 4 dígitos
-                clean = re.sub(r'\s', '', original_text)
-                if len(clean) >= 6:
-                    return f"{clean[:4]}...{clean[-4:]}"
-                return "ES**...****"
-            
-            else:
-                return f"<{entity_type}>"
-        
-        elif method == "replace":
-            # Reemplazar con etiqueta descriptiva
-            return f"<{entity_type}>"
-        
-        elif method == "hash":
-            # Hash determinístico para consistencia
-            import hashlib
-            hash_val = hashlib.md5(original_text.encode()).hexdigest()[:8]
-            return f"<{entity_type}_{hash_val}>"
-        
-        else:
-            return f"<REDACTED>"
+        replacer = _REPLACEMENT_METHODS.get(method)
+        if replacer is None:
+            return "<REDACTED>"
+        return replacer(entity['entity_type'], entity['text'])
     
     def process(self, text: str, use_adaptive: bool = True) -> Tuple[List[Dict], float]:
         """
@@ -560,7 +736,6 @@ class AdaptiveAnonymizer:
         Returns:
             Lista de entidades y confianza promedio
         """
-        import time
         start_time = time.time()
         
         if not use_adaptive or not self.enable_presidio:
@@ -615,7 +790,7 @@ class AdaptiveAnonymizer:
     def _record_processing(self, text: str, entities: List[Dict], confidence: float, time_ms: float):
         """Registra estadísticas para aprendizaje futuro"""
         self.processing_stats.append({
-            'timestamp': datetime.now().isoformat(),
+            'timestamp': time.time(),
             'text_length': len(text),
             'entities_found': len(entities),
             'confidence': confidence,
@@ -669,9 +844,9 @@ class AdaptiveAnonymizer:
         """Intenta extraer un patrón regex del texto"""
         # Simplificado: reemplazar dígitos con \d y letras con [A-Z]
         pattern = text
-        pattern = re.sub(r'\d', r'\\d', pattern)
-        pattern = re.sub(r'[A-Z]', '[A-Z]', pattern)
-        pattern = re.sub(r'[a-z]', '[a-z]', pattern)
+        pattern = _DIGIT_RE.sub(r'\\d', pattern)
+        pattern = _UPPER_RE.sub('[A-Z]', pattern)
+        pattern = _LOWER_RE.sub('[a-z]', pattern)
         
         # Solo guardar si es un patrón útil (no muy genérico)
         if pattern.count('\\d') > 2 or pattern.count('[A-Z]') > 2:
@@ -683,33 +858,77 @@ class AdaptiveAnonymizer:
         with open(self.patterns_file, 'w') as f:
             json.dump(self.learned_patterns, f, indent=2)
     
-    def anonymize_transactions(self, transactions: List[Dict]) -> List[Dict]:
+    def anonymize_transactions(
+        self,
+        transactions: List[Dict],
+        n_workers: Optional[int] = None,
+        chunk_size: int = 1000
+    ) -> List[Dict]:
         """
         Anonimiza una lista de transacciones bancarias.
         
         Args:
             transactions: Lista de diccionarios con transacciones
+            n_workers: Procesos en paralelo (None o 1 = secuencial).
+                Solo aplica al modo de reglas estáticas; con Presidio
+                habilitado se procesa de forma secuencial.
+            chunk_size: Transacciones por tarea enviada a cada proceso
             
         Returns:
             Lista de transacciones anonimizadas
         """
-        anonymized_transactions = []
+        if n_workers and n_workers > 1 and len(transactions) > chunk_size:
+            if self.enable_presidio:
+                logger.info("Presidio habilitado: anonimización secuencial")
+            else:
+                return self._anonymize_transactions_parallel(transactions, n_workers, chunk_size)
+        
+        return [self._anonymize_transaction(transaction) for transaction in transactions]
+    
+    def _anonymize_transaction(self, transaction: Dict) -> Dict:
+        """Anonimiza los campos sensibles de una transacción"""
+        # Copiar transacción
+        anon_tx = transaction.copy()
+        
+        # Anonimizar campos sensibles
+        if 'concept' in anon_tx:
+            anon_tx['concept'] = self.anonymize_text(anon_tx['concept'])
+        if 'description' in anon_tx:
+            anon_tx['description'] = self.anonymize_text(anon_tx['description'])
+        if 'notes' in anon_tx:
+            anon_tx['notes'] = self.anonymize_text(anon_tx['notes'])
+        
+        return anon_tx
+    
+    def _anonymize_transactions_parallel(
+        self,
+        transactions: List[Dict],
+        n_workers: int,
+        chunk_size: int
+    ) -> List[Dict]:
+        """Reparte las transacciones en bloques entre varios procesos"""
+        chunks = [
+            transactions[i:i + chunk_size]
+            for i in range(0, len(transactions), chunk_size)
+        ]
+        
+        # Cada proceso crea su propio anonimizador (solo reglas estáticas)
+        worker_config = {
+            'patterns_file': str(self.patterns_file),
+            'confidence_threshold': self.confidence_threshold,
+            'llm_threshold': self.llm_threshold,
+            'enable_llm': self.enable_llm,
+        }
         
-        for transaction in transactions:
-            # Copiar transacción
-            anon_tx = transaction.copy()
-            
-            # Anonimizar campos sensibles
-            if 'concept' in anon_tx:
-                anon_tx['concept'] = self.anonymize_text(anon_tx['concept'])
-            if 'description' in anon_tx:
-                anon_tx['description'] = self.anonymize_text(anon_tx['description'])
-            if 'notes' in anon_tx:
-                anon_tx['notes'] = self.anonymize_text(anon_tx['notes'])
-                
-            anonymized_transactions.append(anon_tx)
-            
-        return anonymized_transactions
+        logger.info(f"Anonimizando {len(transactions)} transacciones en {len(chunks)} bloques con {n_workers} procesos")
+        
+        with ProcessPoolExecutor(
+            max_workers=n_workers,
+            initializer=_init_worker_anonymizer,
+            initargs=(worker_config,)
+        ) as executor:
+            results = executor.map(_anonymize_chunk, chunks)
+            return [tx for chunk in results for tx in chunk]
     
     def get_statistics(self) -> Dict:
         """Obtiene estadísticas de procesamiento"""
@@ -723,6 +942,8 @@ class AdaptiveAnonymizer:
         
         return {
             'total_processed': total_processed,
+            'first_processed': datetime.fromtimestamp(self.processing_stats[0]['timestamp']).isoformat(),
+            'last_processed': datetime.fromtimestamp(self.processing_stats[-1]['timestamp']).isoformat(),
             'average_confidence': round(avg_confidence, 3),
             'average_time_ms': round(avg_time, 1),
             'average_entities_per_text': round(avg_entities, 1),
@@ -731,6 +952,22 @@ class AdaptiveAnonymizer:
         }
 
 
+# ==================== Workers para procesamiento paralelo ====================
+
+_worker_anonymizer: Optional[AdaptiveAnonymizer] = None
+
+
+def _init_worker_anonymizer(config: Dict):
+    """Inicializa el anonimizador del proceso worker (una vez por proceso)"""
+    global _worker_anonymizer
+    _worker_anonymizer = AdaptiveAnonymizer(**config)
+
+
+def _anonymize_chunk(transactions: List[Dict]) -> List[Dict]:
+    """Anonimiza un bloque de transacciones dentro de un proceso worker"""
+    return _worker_anonymizer.anonymize_transactions(transactions)
+
+
 # Función principal para testing
 if __name__ == "__main__":
     # Ejemplos de uso
@@ -0,0 +1,268 @@
+"""
+Base de datos Hyperscan para los patrones estáticos del anonimizador
+=====================================================================
+Compila todos los patrones regex en una única base de datos Hyperscan
+(multi-patrón, DFA) que se usa como prefiltro: un solo escaneo indica
+qué tipos de entidad pueden aparecer en el texto, y solo esos patrones
+se ejecutan después con `re` para obtener las coincidencias exactas.
+
+La base de datos se serializa en `patterns.hsdb` (junto al paquete) para
+evitar el coste de compilación en cada arranque; ese fichero solo se lee.
+Si no existe, no corresponde a los patrones actuales o fue generado por
+otra versión de Hyperscan, se busca una compilación previa en la caché
+del usuario (~/.cache/pregunta-tus-finanzas o $XDG_CACHE_HOME) y, si
+tampoco está, se compila y se guarda ahí con un renombrado atómico, de
+modo que varios procesos pueden hacerlo a la vez. Dentro de un proceso
+la base de datos cargada se comparte entre todas las instancias del
+anonimizador.
+
+Regenerar con: python scripts/rebuild_patterns_db.py
+
+`compile_scanner` compila además un escáner que devuelve la posición
+de cada coincidencia (modo SOM), para buscar todos los tipos de entidad
+de un texto en un solo recorrido sin pasar después por `re`.
+
+Hyperscan es opcional; sin él `load_patterns_db` y `compile_scanner`
+devuelven None y el anonimizador ejecuta todos los patrones.
+"""
+
+import functools
+import hashlib
+import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+try:
+    import hyperscan
+    HYPERSCAN_AVAILABLE = True
+except ImportError:
+    HYPERSCAN_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Base de datos serializada que se distribuye junto al paquete
+DEFAULT_DB_PATH = Path(__file__).parent / "patterns.hsdb"
+
+# Directorio donde se guardan las compilaciones hechas en tiempo de ejecución
+CACHE_DIR = Path(os.getenv("XDG_CACHE_HOME") or Path.home() / ".cache") / "pregunta-tus-finanzas"
+
+# Longitud de la huella SHA-256 que precede a la base de datos serializada
+_FINGERPRINT_SIZE = 32
+
+
+class PatternDatabase:
+    """Base de datos Hyperscan compilada junto con el mapeo id -> entidad"""
+
+    def __init__(self, database, entity_types: List[str]):
+        self.database = database
+        self.entity_types = entity_types
+
+    def candidate_types(self, text: str) -> Set[str]:
+        """
+        Escanea el texto una sola vez y devuelve los tipos de entidad
+        cuyos patrones tienen al menos una coincidencia.
+        """
+        found = set()
+
+        def on_match(pattern_id, start, end, flags, context):
+            found.add(self.entity_types[pattern_id])
+
+        self.database.scan(text.encode('utf-8'), match_event_handler=on_match)
+        return found
+
+
+class PatternScanner:
+    """Base de datos Hyperscan que devuelve cada coincidencia con su posición"""
+
+    def __init__(self, database, entity_types: List[str]):
+        self.database = database
+        self.entity_types = entity_types
+
+    def scan(self, text: str) -> List[Tuple[str, int, int]]:
+        """
+        Escanea el texto una sola vez con todos los patrones.
+
+        Returns:
+            Lista de (tipo, inicio, fin) ordenada por posición, con
+            índices de caracteres del texto original
+        """
+        data = text.encode('utf-8')
+        matches = []
+
+        def on_match(pattern_id, start, end, flags, context):
+            matches.append((self.entity_types[pattern_id], start, end))
+
+        self.database.scan(data, match_event_handler=on_match)
+
+        if not text.isascii():
+            # Hyperscan informa posiciones en bytes
+            matches = [
+                (entity_type, len(data[:start].decode('utf-8')), len(data[:end].decode('utf-8')))
+                for entity_type, start, end in matches
+            ]
+        matches.sort(key=lambda match: (match[1], match[2]))
+        return matches
+
+
+def _fingerprint(patterns: List[Tuple[str, str]]) -> bytes:
+    """Huella de los patrones y de la versión de Hyperscan"""
+    digest = hashlib.sha256()
+    digest.update(getattr(hyperscan, "__version__", "").encode())
+    for entity_type, regex in patterns:
+        digest.update(b"\0" + entity_type.encode() + b"\0" + regex.encode())
+    return digest.digest()
+
+
+def _compile(patterns: List[Tuple[str, str]]):
+    """Compila los patrones en modo bloque, insensible a mayúsculas"""
+    flags = (
+        hyperscan.HS_FLAG_CASELESS
+        | hyperscan.HS_FLAG_SINGLEMATCH
+        | hyperscan.HS_FLAG_UTF8
+        | hyperscan.HS_FLAG_UCP
+    )
+    database = hyperscan.Database(mode=hyperscan.HS_MODE_BLOCK)
+    database.compile(
+        expressions=[regex.encode() for _, regex in patterns],
+        ids=list(range(len(patterns))),
+        elements=len(patterns),
+        flags=[flags] * len(patterns)
+    )
+    return database
+
+
+def compile_scanner(patterns: List[Tuple[str, str, bool]]) -> Optional[PatternScanner]:
+    """
+    Compila un escáner Hyperscan que informa del inicio y fin de cada coincidencia.
+
+    Args:
+        patterns: Lista de (tipo, regex, insensible a mayúsculas)
+
+    Returns:
+        PatternScanner, o None si Hyperscan no está disponible o algún
+        patrón no admite el modo SOM
+    """
+    if not HYPERSCAN_AVAILABLE:
+        return None
+
+    base_flags = hyperscan.HS_FLAG_SOM_LEFTMOST | hyperscan.HS_FLAG_UTF8 | hyperscan.HS_FLAG_UCP
+    database = hyperscan.Database(mode=hyperscan.HS_MODE_BLOCK)
+    try:
+        database.compile(
+            expressions=[regex.encode() for _, regex, _ in patterns],
+            ids=list(range(len(patterns))),
+            elements=len(patterns),
+            flags=[
+                base_flags | hyperscan.HS_FLAG_CASELESS if caseless else base_flags
+                for _, _, caseless in patterns
+            ]
+        )
+    except Exception as e:
+        logger.warning(f"No se pudo compilar el escáner Hyperscan: {e}")
+        return None
+    return PatternScanner(database, [entity_type for entity_type, _, _ in patterns])
+
+
+def _static_patterns(static_patterns: Dict[str, Dict]) -> List[Tuple[str, str]]:
+    return [(entity_type, config['pattern']) for entity_type, config in static_patterns.items()]
+
+
+def build_patterns_db(static_patterns: Dict[str, Dict], path: Path = DEFAULT_DB_PATH) -> Path:
+    """
+    Compila los patrones y guarda la base de datos serializada.
+
+    Args:
+        static_patterns: Patrones del anonimizador ({entity_type: {'pattern': ...}})
+        path: Fichero de salida
+
+    Returns:
+        Ruta del fichero generado
+    """
+    if not HYPERSCAN_AVAILABLE:
+        raise RuntimeError("Hyperscan no está instalado. Instala con: pip install hyperscan")
+
+    patterns = _static_patterns(static_patterns)
+    database = _compile(patterns)
+
+    path = Path(path)
+    path.write_bytes(_fingerprint(patterns) + hyperscan.dumpb(database))
+    return path
+
+
+def load_patterns_db(static_patterns: Dict[str, Dict], path: Path = DEFAULT_DB_PATH) -> Optional[PatternDatabase]:
+    """
+    Carga la base de datos serializada o la compila si no es válida.
+
+    Args:
+        static_patterns: Patrones del anonimizador ({entity_type: {'pattern': ...}})
+        path: Fichero con la base de datos serializada
+
+    Returns:
+        PatternDatabase, o None si Hyperscan no está disponible
+    """
+    if not HYPERSCAN_AVAILABLE:
+        return None
+
+    return _load_patterns_db(tuple(_static_patterns(static_patterns)), str(path))
+
+
+@functools.lru_cache(maxsize=8)
+def _load_patterns_db(patterns: Tuple[Tuple[str, str], ...], path: str) -> Optional[PatternDatabase]:
+    """
+    Carga la base de datos una vez por proceso y conjunto de patrones: el
+    fichero distribuido, después la caché del usuario y, si no, compila
+    """
+    entity_types = [entity_type for entity_type, _ in patterns]
+    fingerprint = _fingerprint(patterns)
+    cache_path = CACHE_DIR / f"patterns-{fingerprint.hex()[:16]}.hsdb"
+
+    for candidate in (Path(path), cache_path):
+        database = _read_database(candidate, fingerprint)
+        if database is not None:
+            return PatternDatabase(database, entity_types)
+
+    try:
+        database = _compile(patterns)
+    except Exception as e:
+        logger.warning(f"No se pudo compilar la base de datos Hyperscan: {e}")
+        return None
+
+    _write_atomic(cache_path, fingerprint + hyperscan.dumpb(database))
+    return PatternDatabase(database, entity_types)
+
+
+def _read_database(path: Path, fingerprint: bytes):
+    """Deserializa `path` si existe y corresponde a la huella; si no, None"""
+    if not path.exists():
+        return None
+
+    blob = path.read_bytes()
+    if blob[:_FINGERPRINT_SIZE] != fingerprint:
+        logger.info(f"{path.name} no corresponde a los patrones actuales")
+        return None
+
+    try:
+        database = hyperscan.loadb(blob[_FINGERPRINT_SIZE:])
+        database.scratch = hyperscan.Scratch(database)
+        return database
+    except Exception as e:
+        logger.warning(f"No se pudo cargar {path.name}: {e}")
+        return None
+
+
+def _write_atomic(path: Path, blob: bytes):
+    """Escribe en un temporal y lo renombra: los lectores nunca ven un fichero a medias"""
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=path.name, suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(blob)
+            os.replace(tmp_name, path)
+        except BaseException:
+            os.unlink(tmp_name)
+            raise
+    except OSError as e:
+        logger.warning(f"No se pudo guardar {path}: {e}")
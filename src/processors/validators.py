@@ -0,0 +1,139 @@
+"""
+Validadores de identificadores financieros españoles
+====================================================
+Comprobaciones de dígito de control usadas por el anonimizador para
+confirmar las coincidencias de los patrones regex:
+
+- Tarjetas: algoritmo de Luhn
+- DNI: letra de control (mod-23)
+- IBAN: checksum mod-97
+
+Los kernels trabajan sobre códigos ASCII y se compilan con Numba si está
+instalado. Los resultados no se memorizan: una caché retendría en memoria
+los números de tarjeta, DNI e IBAN en claro, y cada validación es lineal
+en la longitud del identificador.
+"""
+
+import re
+
+# Numba es opcional: si no está instalado los kernels se ejecutan en Python puro
+try:
+    import numpy as np
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """Decorador nulo cuando Numba no está disponible"""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+# Tablas de borrado de separadores (str.translate evita el motor regex)
+_STRIP_WS = str.maketrans('', '', ' \t\n\r\f\v')
+_STRIP_WS_DASH = str.maketrans('', '', ' \t\n\r\f\v-')
+
+# Formato IBAN precompilado para el validador; patrón de bytes porque
+# el IBAN ya se ha codificado a ASCII para el kernel mod-97
+_IBAN_FORMAT_RE = re.compile(rb'^[A-Z]{2}\d{2}[A-Z0-9]+$')
+
+DNI_LETTERS = "TRWAGMYFPDXBNJZSQVHLCKE"
+
+
+# ==================== Kernels de validación ====================
+# Operan sobre códigos ASCII (bytes o array uint8) para poder compilarse
+# con Numba; sin Numba se ejecutan igual sobre el objeto bytes.
+
+@njit(cache=True)
+def _luhn_u8(buf) -> bool:
+    """Algoritmo de Luhn sobre dígitos ASCII"""
+    total = 0
+    double = False
+    for i in range(len(buf) - 1, -1, -1):
+        digit = buf[i] - 48
+        if double:
+            digit *= 2
+            if digit > 9:
+                digit -= 9
+        total += digit
+        double = not double
+    return total % 10 == 0
+
+
+@njit(cache=True)
+def _mod97_u8(buf) -> int:
+    """Resto mod-97 de un IBAN reordenado (letras A=10 ... Z=35)"""
+    remainder = 0
+    for i in range(len(buf)):
+        code = buf[i]
+        if code < 65:
+            remainder = (remainder * 10 + code - 48) % 97
+        else:
+            remainder = (remainder * 100 + code - 55) % 97
+    return remainder
+
+
+@njit(cache=True)
+def _dni_u8(buf) -> int:
+    """Índice mod-23 de la letra de control de un DNI (-1 si no es numérico)"""
+    number = 0
+    for i in range(len(buf)):
+        code = buf[i]
+        if code < 48 or code > 57:
+            return -1
+        number = number * 10 + code - 48
+    return number % 23
+
+
+def _as_u8(value: str):
+    """Convierte un texto ASCII al buffer que esperan los kernels"""
+    return _bytes_u8(value.encode('ascii'))
+
+
+def _bytes_u8(data: bytes):
+    """Buffer de los kernels a partir de bytes ASCII"""
+    if NUMBA_AVAILABLE:
+        return np.frombuffer(data, dtype=np.uint8)
+    return data
+
+
+# ==================== Validadores ====================
+
+def validate_luhn(number: str) -> bool:
+    """Valida número de tarjeta con algoritmo de Luhn"""
+    # Eliminar espacios y guiones
+    number = number.translate(_STRIP_WS_DASH)
+    
+    if not (number.isascii() and number.isdigit()) or len(number) < 12 or len(number) > 19:
+        return False
+    
+    return bool(_luhn_u8(_as_u8(number)))
+
+
+def validate_dni(dni: str) -> bool:
+    """Valida DNI español con letra de control"""
+    if len(dni) != 9 or not dni.isascii():
+        return False
+    
+    index = _dni_u8(_as_u8(dni[:8]))
+    if index < 0:
+        return False
+    
+    return DNI_LETTERS[index] == dni[8].upper()
+
+
+def validate_iban(iban: str) -> bool:
+    """Valida IBAN con checksum"""
+    # Eliminar espacios
+    iban = iban.translate(_STRIP_WS)
+    if not iban.isascii():
+        return False
+    
+    data = iban.encode('ascii')
+    if not _IBAN_FORMAT_RE.match(data):
+        return False
+    
+    # Mover primeros 4 caracteres al final y validar checksum
+    rearranged = data[4:] + data[:4]
+    return _mod97_u8(_bytes_u8(rearranged)) == 1
@@ -0,0 +1,112 @@
+"""
+Carga rápida del JSON de chunks con embeddings
+El JSON generado por generate_embeddings.py contiene miles de listas de
+floats, y json.load las parsea número a número. La primera lectura migra
+el fichero a dos ficheros auxiliares junto al original:
+
+- <nombre>.npz: matriz (N, D) float32 con los embeddings
+- <nombre>.meta.json: el resto del documento, sin los vectores
+
+Las lecturas siguientes cargan la matriz con np.load y solo parsean los
+metadatos. Si el JSON original es más reciente, se vuelve a migrar.
+"""
+
+import json
+import logging
+from pathlib import Path
+from typing import Any, Dict, List, Union
+
+import numpy as np
+
+# orjson es opcional: parsea los floats mucho más rápido que json
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Clave con la que cada chunk guarda su fila en la matriz de embeddings
+EMBEDDING_ROW_KEY = '_embedding_row'
+
+
+def _chunk_list(data: Dict[str, Any]) -> List[Dict]:
+    """Lista de chunks según el formato ('documents' o 'chunks')"""
+    if 'documents' in data:
+        return data['documents']
+    return data.get('chunks', [])
+
+
+def _loads(raw: bytes) -> Any:
+    return orjson.loads(raw) if ORJSON_AVAILABLE else json.loads(raw)
+
+
+def _dumps(data: Any) -> bytes:
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data)
+    return json.dumps(data, ensure_ascii=False).encode('utf-8')
+
+
+def load_chunks_fast(path: Union[str, Path]) -> Dict[str, Any]:
+    """
+    Carga el JSON de chunks usando (o creando) los ficheros .npz y .meta.json
+
+    Args:
+        path: Ruta al archivo JSON con los chunks
+
+    Returns:
+        El documento con el mismo formato que json.load; el campo
+        'embedding' de cada chunk es una fila float32 de la matriz
+    """
+    path = Path(path)
+    npz_path = path.with_suffix('.npz')
+    meta_path = path.with_suffix('.meta.json')
+    source_mtime = path.stat().st_mtime_ns
+
+    if (npz_path.exists() and meta_path.exists()
+            and npz_path.stat().st_mtime_ns >= source_mtime
+            and meta_path.stat().st_mtime_ns >= source_mtime):
+        data = _loads(meta_path.read_bytes())
+        matrix = np.load(npz_path)['emb']
+    else:
+        data, matrix = _migrate(path, npz_path, meta_path)
+        if matrix is None:
+            return data
+
+    for chunk in _chunk_list(data):
+        row = chunk.pop(EMBEDDING_ROW_KEY, None)
+        if row is not None:
+            chunk['embedding'] = matrix[row]
+
+    return data
+
+
+def _migrate(path: Path, npz_path: Path, meta_path: Path):
+    """Parsea el JSON una vez y escribe la matriz y los metadatos por separado"""
+    logger.info(f"🔄 Migrando embeddings de {path.name} a {npz_path.name}")
+    data = _loads(path.read_bytes())
+
+    chunks = [chunk for chunk in _chunk_list(data) if 'embedding' in chunk]
+
+    # Sin embeddings o con dimensiones distintas no hay matriz (N, D):
+    # se devuelven los chunks tal cual, sin ficheros auxiliares
+    dims = {len(chunk['embedding']) for chunk in chunks}
+    if len(dims) != 1:
+        if dims:
+            logger.warning(f"⚠️ Embeddings de dimensiones distintas en {path.name}, no se crea {npz_path.name}")
+        return data, None
+
+    matrix = np.asarray([chunk.pop('embedding') for chunk in chunks], dtype=np.float32)
+    for row, chunk in enumerate(chunks):
+        chunk[EMBEDDING_ROW_KEY] = row
+
+    try:
+        # Escribir primero la matriz: los metadatos marcan la migración como completa
+        with open(npz_path, 'wb') as f:
+            np.savez(f, emb=matrix)
+        meta_path.write_bytes(_dumps(data))
+    except OSError as e:
+        logger.warning(f"⚠️ No se pudieron guardar {npz_path.name}/{meta_path.name}: {e}")
+
+    return data, matrix
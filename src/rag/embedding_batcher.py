@@ -0,0 +1,117 @@
+"""
+Agrupación de peticiones de embeddings para LightRAG
+Combina en una sola llamada a la API los textos que llegan desde
+inserciones concurrentes, en lugar de una petición HTTP por llamada.
+"""
+
+import asyncio
+import logging
+from typing import Awaitable, Callable, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Límite de tokens por petición del endpoint de embeddings de OpenAI
+MAX_TOKENS_PER_REQUEST = 300_000
+
+
+class BatchingEmbedder:
+    """
+    Envuelve una función de embeddings asíncrona (p. ej. `openai_embed`)
+    y agrupa los textos recibidos durante una ventana corta de tiempo.
+
+    Cada llamada encola sus textos y espera a su resultado; la cola se
+    envía cuando alcanza `batch_size` textos o cuando pasan `flush_ms`
+    milisegundos desde el primer texto pendiente.
+    """
+
+    def __init__(
+        self,
+        embed_func: Callable[[List[str]], Awaitable[np.ndarray]],
+        batch_size: int = 128,
+        flush_ms: int = 20,
+        max_batch_tokens: int = MAX_TOKENS_PER_REQUEST
+    ):
+        """
+        Args:
+            embed_func: Función async que recibe una lista de textos y devuelve sus vectores
+            batch_size: Máximo de textos por petición
+            flush_ms: Espera máxima antes de enviar una petición incompleta
+            max_batch_tokens: Tokens estimados máximos por petición
+        """
+        self.embed_func = embed_func
+        self.batch_size = batch_size
+        self.flush_interval = flush_ms / 1000
+        self.max_batch_tokens = max_batch_tokens
+        self._buffer: List[Tuple[str, asyncio.Future]] = []
+        self._flush_task: Optional[asyncio.Task] = None
+        self._send_tasks = set()
+
+    async def __call__(self, texts: List[str]) -> np.ndarray:
+        """Devuelve los embeddings de `texts` en el mismo orden"""
+        loop = asyncio.get_running_loop()
+        futures = []
+
+        for text in texts:
+            future = loop.create_future()
+            self._buffer.append((text, future))
+            futures.append(future)
+
+        # Enviar ya los lotes completos; el resto espera a la ventana
+        if len(self._buffer) >= self.batch_size:
+            self._flush_now(drain=False)
+        if self._buffer and self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_later())
+
+        vectors = await asyncio.gather(*futures)
+        return np.array(vectors)
+
+    async def _flush_later(self):
+        """Envía lo pendiente cuando vence la ventana de agrupación"""
+        await asyncio.sleep(self.flush_interval)
+        self._flush_task = None
+        self._flush_now()
+
+    def _flush_now(self, drain: bool = True):
+        """
+        Divide la cola en peticiones y las lanza
+
+        Args:
+            drain: Enviar también el último lote aunque esté incompleto
+        """
+        while self._buffer and (drain or len(self._buffer) >= self.batch_size):
+            task = asyncio.create_task(self._send(self._take_batch()))
+            # Mantener referencia hasta que termine la petición
+            self._send_tasks.add(task)
+            task.add_done_callback(self._send_tasks.discard)
+
+    def _take_batch(self) -> List[Tuple[str, asyncio.Future]]:
+        """Extrae de la cola un lote dentro de los límites de tamaño y tokens"""
+        batch = []
+        tokens = 0
+
+        while self._buffer and len(batch) < self.batch_size:
+            # Estimación aproximada: ~4 caracteres por token
+            text_tokens = len(self._buffer[0][0]) // 4 + 1
+            if batch and tokens + text_tokens > self.max_batch_tokens:
+                break
+            batch.append(self._buffer.pop(0))
+            tokens += text_tokens
+
+        return batch
+
+    async def _send(self, batch: List[Tuple[str, asyncio.Future]]):
+        """Realiza una petición y reparte los vectores entre los que esperan"""
+        try:
+            vectors = await self.embed_func([text for text, _ in batch])
+        except Exception as e:
+            logger.error(f"❌ Error generando embeddings ({len(batch)} textos): {e}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), vector in zip(batch, vectors):
+            if not future.done():
+                future.set_result(vector)
@@ -0,0 +1,221 @@
+"""
+Caché persistente de embeddings
+Evita volver a pedir a la API los embeddings de textos ya vistos
+(re-ejecuciones de la demo, re-indexado de los mismos chunks).
+
+- L1: LRU en memoria (OrderedDict)
+- L2: Redis compartido entre procesos (opcional, si hay REDIS_URL)
+- L3: SQLite en disco
+
+La clave es el SHA-256 de (modelo, texto). Con `normalize=True` (solo
+para embeddings de consultas) el texto se normaliza antes, de modo que la
+misma pregunta con distinto espaciado o mayúsculas reutiliza el vector;
+esas claves van en un espacio aparte y nunca coinciden con las de los
+documentos, donde "CAFE  BAR" y "Cafe Bar" pueden ser textos distintos.
+
+Los vectores se guardan cuantizados a int8 con una escala float32 por
+vector (1540 bytes en lugar de 6144 para 1536 dimensiones), en las tres
+capas; se decuantizan al devolverlos.
+"""
+
+import hashlib
+import logging
+import os
+import sqlite3
+from collections import OrderedDict
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional, Union
+
+import numpy as np
+
+try:
+    import redis.asyncio as aioredis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Modelo por defecto de openai_embed en LightRAG
+DEFAULT_EMBEDDING_MODEL = "text-embedding-3-small"
+
+# Caducidad de los embeddings en Redis (7 días)
+REDIS_TTL_SECONDS = 7 * 24 * 3600
+REDIS_KEY_PREFIX = "emb8v2:"
+
+
+def normalize_text(text: str) -> str:
+    """Normaliza el texto antes de calcular la clave (espacios y mayúsculas)"""
+    return " ".join(text.split()).lower()
+
+
+def quantize(vector: np.ndarray) -> bytes:
+    """Codifica un vector como escala float32 + componentes int8"""
+    vector = np.asarray(vector, dtype=np.float32)
+    scale = np.float32(np.abs(vector).max() / 127) if vector.size else np.float32(0)
+    if scale == 0:
+        scale = np.float32(1)
+    q = np.round(vector / scale).astype(np.int8)
+    return scale.tobytes() + q.tobytes()
+
+
+def dequantize(blob: bytes) -> np.ndarray:
+    """Decodifica un vector guardado con `quantize`"""
+    scale = np.frombuffer(blob, dtype=np.float32, count=1)[0]
+    return np.frombuffer(blob, dtype=np.int8, offset=4).astype(np.float32) * scale
+
+
+class CachedEmbedder:
+    """
+    Envuelve una función de embeddings asíncrona y cachea sus vectores.
+
+    Solo los textos que no están en caché se envían a la función interna;
+    el resultado conserva el orden de los textos de entrada.
+    """
+
+    def __init__(
+        self,
+        inner: Callable[[List[str]], Awaitable[np.ndarray]],
+        path: Union[str, Path],
+        model: str = DEFAULT_EMBEDDING_MODEL,
+        capacity: int = 10_000,
+        redis_url: Optional[str] = None,
+        normalize: bool = False
+    ):
+        """
+        Args:
+            inner: Función async que recibe una lista de textos y devuelve sus vectores
+            path: Fichero SQLite donde persistir los embeddings
+            model: Modelo de embeddings (forma parte de la clave)
+            capacity: Entradas máximas en la caché en memoria
+            redis_url: URL de Redis; por defecto la variable de entorno REDIS_URL
+            normalize: Normalizar espacios y mayúsculas antes de calcular la
+                clave; solo para un embedder dedicado a consultas
+        """
+        self.inner = inner
+        self.model = model
+        self.capacity = capacity
+        self.normalize = normalize
+        # Vectores cuantizados (ver `quantize`)
+        self.memory: "OrderedDict[bytes, bytes]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(str(self.path))
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings_q8_v2 (hash BLOB PRIMARY KEY, vec BLOB NOT NULL)"
+        )
+        self.db.commit()
+
+        self.redis = None
+        redis_url = redis_url or os.getenv("REDIS_URL")
+        if redis_url:
+            if REDIS_AVAILABLE:
+                self.redis = aioredis.Redis.from_url(redis_url)
+            else:
+                logger.warning("⚠️ REDIS_URL definida pero redis no está instalado (pip install redis)")
+
+    def _key(self, text: str) -> bytes:
+        if self.normalize:
+            # Prefijo propio: las claves normalizadas no se mezclan con las exactas
+            text = "query\0" + normalize_text(text)
+        return hashlib.sha256((self.model + "\0" + text).encode('utf-8')).digest()
+
+    def _remember(self, key: bytes, blob: bytes):
+        """Añade a la caché en memoria, expulsando la entrada menos reciente"""
+        self.memory[key] = blob
+        self.memory.move_to_end(key)
+        if len(self.memory) > self.capacity:
+            self.memory.popitem(last=False)
+
+    async def _lookup(self, keys: List[bytes]) -> Dict[bytes, np.ndarray]:
+        """Busca las claves en memoria, después en Redis y por último en SQLite"""
+        found = {}
+        missing = []
+
+        for key in keys:
+            blob = self.memory.get(key)
+            if blob is not None:
+                self.memory.move_to_end(key)
+                found[key] = dequantize(blob)
+            else:
+                missing.append(key)
+
+        if missing and self.redis is not None:
+            try:
+                blobs = await self.redis.mget([REDIS_KEY_PREFIX.encode() + key for key in missing])
+            except Exception as e:
+                logger.warning(f"⚠️ Error leyendo de Redis: {e}")
+                blobs = [None] * len(missing)
+
+            still_missing = []
+            for key, blob in zip(missing, blobs):
+                if blob is None:
+                    still_missing.append(key)
+                    continue
+                self._remember(key, blob)
+                found[key] = dequantize(blob)
+            missing = still_missing
+
+        if missing:
+            placeholders = ",".join("?" * len(missing))
+            rows = self.db.execute(
+                f"SELECT hash, vec FROM embeddings_q8_v2 WHERE hash IN ({placeholders})",
+                missing
+            ).fetchall()
+            for key, blob in rows:
+                self._remember(key, blob)
+                found[key] = dequantize(blob)
+
+        return found
+
+    async def _store_redis(self, rows: List[tuple]):
+        """Publica los vectores nuevos en Redis con caducidad"""
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for key, blob in rows:
+                    pipe.set(REDIS_KEY_PREFIX.encode() + key, blob, ex=REDIS_TTL_SECONDS)
+                await pipe.execute()
+        except Exception as e:
+            logger.warning(f"⚠️ Error escribiendo en Redis: {e}")
+
+    async def __call__(self, texts: List[str]) -> np.ndarray:
+        """Devuelve los embeddings de `texts` en el mismo orden"""
+        keys = [self._key(text) for text in texts]
+        cached = await self._lookup(list(set(keys)))
+
+        # Textos pendientes (sin duplicados) que hay que pedir a la API
+        pending = {}
+        for key, text in zip(keys, texts):
+            if key not in cached and key not in pending:
+                pending[key] = text
+
+        self.hits += len(texts) - len(pending)
+        self.misses += len(pending)
+
+        if pending:
+            vectors = await self.inner(list(pending.values()))
+            rows = []
+            for key, vector in zip(pending, vectors):
+                # Los vectores recién calculados se devuelven sin pérdida
+                cached[key] = np.asarray(vector, dtype=np.float32)
+                blob = quantize(vector)
+                self._remember(key, blob)
+                rows.append((key, blob))
+
+            self.db.executemany(
+                "INSERT OR REPLACE INTO embeddings_q8_v2 (hash, vec) VALUES (?, ?)", rows
+            )
+            self.db.commit()
+            if self.redis is not None:
+                await self._store_redis(rows)
+
+        return np.stack([cached[key] for key in keys])
+
+    async def close(self):
+        """Cierra las conexiones con SQLite y Redis"""
+        self.db.close()
+        if self.redis is not None:
+            await self.redis.aclose()
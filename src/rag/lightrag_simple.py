@@ -6,11 +6,16 @@ Basada en la documentación oficial de HKUDS/LightRAG
 
 import os
 import asyncio
+import atexit
+import hashlib
 import json
+import random
+import shutil
+import tempfile
 from pathlib import Path
 from dotenv import load_dotenv
 import logging
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Callable, Optional, Set
 
 # Cargar variables de entorno
 load_dotenv()
@@ -22,7 +27,6 @@ logger = logging.getLogger(__name__)
 # Importar LightRAG
 try:
     from lightrag import LightRAG, QueryParam
-    from lightrag.llm.openai import gpt_4o_mini_complete, openai_embed
     from lightrag.utils import EmbeddingFunc
     LIGHTRAG_AVAILABLE = True
     logger.info("✅ LightRAG importado correctamente")
@@ -32,26 +36,85 @@ except ImportError as e:
     LIGHTRAG_AVAILABLE = False
     exit(1)
 
+try:
+    from chunk_loader import load_chunks_fast
+    from embedding_batcher import BatchingEmbedder
+    from embedding_cache import CachedEmbedder
+    from openai_client import SharedOpenAIClient
+except ImportError:
+    from .chunk_loader import load_chunks_fast
+    from .embedding_batcher import BatchingEmbedder
+    from .embedding_cache import CachedEmbedder
+    from .openai_client import SharedOpenAIClient
+
+# Desfase máximo (segundos) al arrancar cada inserción concurrente
+INSERT_JITTER_SECONDS = 0.1
+
+# Hashes de los textos ya insertados (se conserva entre ejecuciones)
+INSERTED_HASHES_FILE = "inserted_hashes.json"
+
+# Líneas del resumen estadístico que se añaden al texto de cada chunk
+CHUNK_STAT_LINES = {
+    'total': "Total: €{total:.2f}",
+    'count': "Número de transacciones: {count}",
+    'average': "Promedio: €{average:.2f}",
+}
+
 
 class SimpleFinancialRAG:
     """
     Implementación simplificada de LightRAG para datos financieros
     """
     
-    def __init__(self, working_dir: str = "rag_financial_knowledge"):
+    def __init__(self, working_dir: str = "rag_financial_knowledge", max_concurrency: int = 8):
         """
         Inicializa el sistema RAG financiero
         
         Args:
             working_dir: Directorio donde se guardará el grafo de conocimiento
+            max_concurrency: Máximo de chunks insertándose en paralelo
         """
         self.working_dir = Path(working_dir)
         self.working_dir.mkdir(parents=True, exist_ok=True)
+        
+        # Opcional: trabajar en RAM (tmpfs) y volcar a disco al terminar
+        if os.getenv("RAG_USE_TMPFS") == "1" and Path("/dev/shm").exists():
+            self.working_dir = self._use_tmpfs(self.working_dir)
+        
+        self.max_concurrency = max_concurrency
         self.rag = None
+        self.openai = None
+        self.embedder = None
+        # Plantillas de _prepare_chunk_text por estructura de chunk
+        self._formatters = {}
+        # Consultas lanzadas por query_multi_mode que siguen en curso
+        self._pending_queries = set()
         self.initialized = False
         
         logger.info(f"📁 Directorio de trabajo: {self.working_dir}")
         
+    @staticmethod
+    def _use_tmpfs(persistent_dir: Path) -> Path:
+        """
+        Copia el directorio de trabajo a /dev/shm para que las escrituras
+        de LightRAG (JSON, GraphML) vayan a memoria, y registra la copia
+        de vuelta a `persistent_dir` al salir del proceso
+        
+        Returns:
+            Directorio de trabajo en tmpfs
+        """
+        tmp_dir = Path(tempfile.mkdtemp(prefix="lightrag_", dir="/dev/shm"))
+        shutil.copytree(persistent_dir, tmp_dir, dirs_exist_ok=True)
+        
+        def _sync_back():
+            shutil.copytree(tmp_dir, persistent_dir, dirs_exist_ok=True)
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            logger.info(f"💾 Directorio de trabajo volcado a {persistent_dir}")
+        
+        atexit.register(_sync_back)
+        logger.info(f"⚡ Usando tmpfs para el directorio de trabajo: {tmp_dir}")
+        return tmp_dir
+    
     async def initialize(self):
         """
         Inicializa LightRAG con la configuración correcta según la documentación
@@ -62,15 +125,28 @@ class SimpleFinancialRAG:
         
         logger.info("🔧 Inicializando LightRAG...")
         
+        # Un único cliente (pool de conexiones) para embeddings y LLM
+        self.openai = SharedOpenAIClient()
+        
+        # Agrupa los textos de inserciones concurrentes en una sola petición
+        self.embedder = BatchingEmbedder(self.openai.embed, batch_size=128, flush_ms=20)
+        
+        # Caché de embeddings (memoria + Redis opcional + SQLite) delante de la API
+        if os.getenv("ENABLE_EMBEDDING_CACHE", "1").lower() in ("1", "true"):
+            self.embedder = CachedEmbedder(
+                self.embedder,
+                path=self.working_dir / "embedding_cache.sqlite"
+            )
+        
         try:
             # Inicializar LightRAG con configuración básica
             self.rag = LightRAG(
                 working_dir=str(self.working_dir),
-                llm_model_func=gpt_4o_mini_complete,
+                llm_model_func=self.openai.complete,
                 embedding_func=EmbeddingFunc(
                     embedding_dim=1536,
                     max_token_size=8191,
-                    func=openai_embed
+                    func=self.embedder
                 )
             )
             
@@ -93,6 +169,15 @@ class SimpleFinancialRAG:
             logger.error(f"❌ Error inicializando LightRAG: {e}")
             raise
     
+    async def aclose(self):
+        """
+        Libera las conexiones HTTP y la caché de embeddings
+        """
+        if isinstance(self.embedder, CachedEmbedder):
+            await self.embedder.close()
+        if self.openai is not None:
+            await self.openai.aclose()
+    
     async def insert_financial_data(self, chunks_path: str):
         """
         Inserta los chunks financieros en LightRAG
@@ -105,9 +190,8 @@ class SimpleFinancialRAG:
         
         logger.info(f"📥 Cargando chunks desde: {chunks_path}")
         
-        # Cargar chunks
-        with open(chunks_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        # Cargar chunks (los vectores van al .npz auxiliar, no se parsean como JSON)
+        data = load_chunks_fast(chunks_path)
         
         # Obtener lista de chunks según el formato
         if 'documents' in data:
@@ -119,33 +203,100 @@ class SimpleFinancialRAG:
         
         logger.info(f"📊 Procesando {len(chunks)} chunks")
         
-        # Insertar cada chunk como un documento de texto enriquecido
-        inserted = 0
+        # Preparar el texto de cada chunk una sola vez; un chunk mal formado
+        # se registra como fallido sin abortar la carga del resto
+        texts = []
         failed = 0
-        
         for i, chunk in enumerate(chunks):
             try:
-                # Preparar el texto del chunk
-                text = self._prepare_chunk_text(chunk)
-                
-                if text:
-                    # Insertar en LightRAG (usa ainsert para async)
-                    await self.rag.ainsert(text)
-                    inserted += 1
-                    logger.info(f"  ✓ Chunk {i+1}/{len(chunks)} insertado")
-                else:
-                    logger.warning(f"  ⚠️ Chunk {i+1} vacío, saltando")
-                    
+                texts.append(self._prepare_chunk_text(chunk))
             except Exception as e:
+                logger.error(f"  ✗ Error preparando chunk {i+1}: {e}")
+                texts.append(None)
                 failed += 1
-                logger.error(f"  ✗ Error en chunk {i+1}: {e}")
+        
+        # Descartar chunks vacíos y textos ya insertados (en esta u otras ejecuciones)
+        inserted_hashes = self._load_inserted_hashes()
+        seen = set(inserted_hashes)
+        pending = []
+        empty = 0
+        duplicates = 0
+        
+        for i, text in enumerate(texts):
+            if text is None:
+                continue
+            if not text:
+                logger.warning(f"  ⚠️ Chunk {i+1} vacío, saltando")
+                empty += 1
+                continue
+            
+            text_hash = hashlib.sha256(text.encode('utf-8')).hexdigest()
+            if text_hash in seen:
+                duplicates += 1
+                continue
+            
+            seen.add(text_hash)
+            pending.append((i, text, text_hash))
+        
+        # Insertar los chunks en paralelo (las llamadas al LLM son I/O)
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        
+        async def insert(i: int, text: str, text_hash: str):
+            await self._insert_chunk(i, text, len(chunks), semaphore)
+            # Registrar el hash en cuanto el chunk queda insertado
+            inserted_hashes.add(text_hash)
+        
+        inserted = 0
+        try:
+            results = await asyncio.gather(
+                *(insert(i, text, text_hash) for i, text, text_hash in pending),
+                return_exceptions=True
+            )
+            
+            for (i, _, _), result in zip(pending, results):
+                if isinstance(result, Exception):
+                    # Se reintentará en la próxima ejecución
+                    failed += 1
+                    logger.error(f"  ✗ Error en chunk {i+1}: {result}")
+                else:
+                    inserted += 1
+        finally:
+            # Conservar los chunks ya insertados aunque la carga se interrumpa
+            self._save_inserted_hashes(inserted_hashes)
         
         logger.info(f"\n✅ Inserción completada:")
         logger.info(f"  - Insertados: {inserted}")
+        logger.info(f"  - Duplicados omitidos: {duplicates}")
+        logger.info(f"  - Vacíos: {empty}")
         logger.info(f"  - Fallidos: {failed}")
         
         return inserted, failed
     
+    def _load_inserted_hashes(self) -> Set[str]:
+        """Carga los hashes SHA-256 de los textos ya insertados"""
+        path = self.working_dir / INSERTED_HASHES_FILE
+        if path.exists():
+            with open(path, 'r', encoding='utf-8') as f:
+                return set(json.load(f))
+        return set()
+    
+    def _save_inserted_hashes(self, hashes: Set[str]):
+        """Guarda los hashes de los textos insertados"""
+        with open(self.working_dir / INSERTED_HASHES_FILE, 'w', encoding='utf-8') as f:
+            json.dump(sorted(hashes), f)
+    
+    async def _insert_chunk(self, i: int, text: str, total: int, semaphore: asyncio.Semaphore):
+        """
+        Inserta el texto de un chunk en LightRAG respetando el límite de concurrencia
+        """
+        # Pequeño desfase aleatorio para no lanzar todas las peticiones a la vez
+        await asyncio.sleep(random.uniform(0, INSERT_JITTER_SECONDS))
+        
+        async with semaphore:
+            # Insertar en LightRAG (usa ainsert para async)
+            await self.rag.ainsert(text)
+            logger.info(f"  ✓ Chunk {i+1}/{total} insertado")
+    
     def _prepare_chunk_text(self, chunk: Dict) -> str:
         """
         Prepara el texto del chunk para inserción en LightRAG
@@ -170,37 +321,58 @@ class SimpleFinancialRAG:
         # Obtener metadata
         metadata = chunk.get('metadata', {})
         chunk_type = metadata.get('chunk_type', chunk.get('chunk_type', 'transaction'))
+        date_range = metadata.get('date_range', {})
+        stats = metadata.get('statistical_summary', {})
         
+        fields = {'content': content}
+        if 'start' in date_range:
+            fields['start'] = date_range['start']
+            fields['end'] = date_range.get('end', 'actual')
+        if metadata.get('category'):
+            fields['category'] = metadata['category']
+        for key in CHUNK_STAT_LINES:
+            if key in stats:
+                fields[key] = stats[key]
+        
+        # Los chunks de un mismo tipo comparten estructura: reutilizar la plantilla
+        signature = (chunk_type, tuple(fields))
+        formatter = self._formatters.get(signature)
+        if formatter is None:
+            formatter = self._formatters[signature] = self._build_formatter(chunk_type, fields)
+        
+        return formatter(**fields)
+    
+    @staticmethod
+    def _build_formatter(chunk_type: str, fields: Dict[str, Any]):
+        """
+        Construye la plantilla de texto enriquecido para una estructura de chunk
+        
+        Returns:
+            Función que recibe los campos del chunk y devuelve el texto
+        """
         # Construir texto enriquecido para mejor extracción de entidades
         parts = []
         
         # Añadir tipo de chunk como contexto
-        parts.append(f"[TIPO: {chunk_type}]")
+        parts.append("[TIPO: " + str(chunk_type).replace("{", "{{").replace("}", "}}") + "]")
         
         # Añadir información temporal si existe
-        if 'date_range' in metadata:
-            date_range = metadata['date_range']
-            if 'start' in date_range:
-                parts.append(f"Período: {date_range['start']} - {date_range.get('end', 'actual')}")
+        if 'start' in fields:
+            parts.append("Período: {start} - {end}")
         
         # Añadir categoría si existe
-        if metadata.get('category'):
-            parts.append(f"Categoría: {metadata['category']}")
+        if 'category' in fields:
+            parts.append("Categoría: {category}")
         
         # Añadir el contenido principal
-        parts.append(content)
+        parts.append("{content}")
         
         # Añadir resumen estadístico si existe
-        if 'statistical_summary' in metadata:
-            stats = metadata['statistical_summary']
-            if 'total' in stats:
-                parts.append(f"Total: €{stats['total']:.2f}")
-            if 'count' in stats:
-                parts.append(f"Número de transacciones: {stats['count']}")
-            if 'average' in stats:
-                parts.append(f"Promedio: €{stats['average']:.2f}")
-        
-        return "\n".join(parts)
+        for key, line in CHUNK_STAT_LINES.items():
+            if key in fields:
+                parts.append(line)
+        
+        return "\n".join(parts).format
     
     async def query(self, question: str, mode: str = "hybrid") -> str:
         """
@@ -237,29 +409,134 @@ class SimpleFinancialRAG:
             logger.error(f"❌ Error en consulta: {e}")
             return f"Error procesando la consulta: {str(e)}"
     
-    async def batch_query(self, queries: List[str], mode: str = "hybrid") -> List[Dict]:
+    async def query_stream(self, question: str, mode: str = "hybrid", max_preview_chars: int = 300) -> str:
+        """
+        Realiza una consulta en streaming y deja de leer la respuesta en
+        cuanto supera `max_preview_chars` (para vistas previas), de modo
+        que no se paga la generación del resto
+        
+        Args:
+            question: Pregunta en lenguaje natural
+            mode: Modo de búsqueda ("naive", "local", "global", "hybrid", "mix")
+            max_preview_chars: Caracteres a partir de los cuales se corta
+            
+        Returns:
+            Respuesta completa, o sus primeros fragmentos (más de
+            `max_preview_chars` caracteres) si se cortó
+        """
+        if not self.initialized:
+            raise RuntimeError("LightRAG no está inicializado")
+        
+        logger.info(f"\n🔍 Consulta (stream): {question}")
+        logger.info(f"   Modo: {mode}")
+        
+        try:
+            response = await self.rag.aquery(question, QueryParam(mode=mode, stream=True))
+            
+            # Respuestas en caché llegan como texto completo
+            if isinstance(response, str) or response is None:
+                return response or "No pude generar una respuesta para esa pregunta."
+            
+            parts = []
+            length = 0
+            try:
+                async for fragment in response:
+                    parts.append(fragment)
+                    length += len(fragment)
+                    if length > max_preview_chars:
+                        break
+            finally:
+                # Cerrar el stream corta la generación en el servidor
+                if hasattr(response, "aclose"):
+                    await response.aclose()
+            
+            return "".join(parts)
+            
+        except Exception as e:
+            logger.error(f"❌ Error en consulta: {e}")
+            return f"Error procesando la consulta: {str(e)}"
+    
+    async def batch_query(self, queries: List[str], mode: str = "hybrid", max_parallel_queries: int = 5) -> List[Dict]:
         """
         Realiza múltiples consultas en batch
         
         Args:
             queries: Lista de preguntas
             mode: Modo de búsqueda
+            max_parallel_queries: Máximo de consultas simultáneas
             
         Returns:
-            Lista de resultados
+            Lista de resultados (en el mismo orden que las preguntas)
         """
-        results = []
+        semaphore = asyncio.Semaphore(max_parallel_queries)
         
-        for query in queries:
-            response = await self.query(query, mode)
-            results.append({
+        async def _one(query: str) -> Dict:
+            async with semaphore:
+                response = await self.query(query, mode)
+            return {
                 "query": query,
                 "response": response,
                 "mode": mode
-            })
+            }
         
-        return results
-
+        return await asyncio.gather(*[_one(query) for query in queries])
+    
+    async def query_multi_mode(
+        self,
+        question: str,
+        modes: List[str],
+        interactive_timeout: float = 0.2,
+        on_late_result: Optional[Callable[[str, str], None]] = None
+    ) -> Dict[str, str]:
+        """
+        Lanza la misma consulta en varios modos y devuelve en cuanto hay
+        respuesta, sin esperar a los modos lentos (recorridos del grafo)
+        
+        Args:
+            question: Pregunta en lenguaje natural
+            modes: Modos de búsqueda a comparar
+            interactive_timeout: Espera adicional (segundos) tras la primera
+                respuesta para recoger otros modos rápidos
+            on_late_result: Función (modo, respuesta) para los modos que
+                terminan después de devolver
+            
+        Returns:
+            Respuestas de los modos completados, por modo
+        """
+        tasks = {asyncio.create_task(self.query(question, mode)): mode for mode in modes}
+        
+        done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        if pending:
+            more, pending = await asyncio.wait(pending, timeout=interactive_timeout)
+            done |= more
+        
+        # Los modos lentos siguen en segundo plano
+        for task in pending:
+            mode = tasks[task]
+            self._pending_queries.add(task)
+            task.add_done_callback(self._pending_queries.discard)
+            task.add_done_callback(
+                lambda t, mode=mode: self._late_result(mode, t, on_late_result)
+            )
+        
+        return {tasks[task]: task.result() for task in done}
+    
+    @staticmethod
+    def _late_result(mode: str, task: asyncio.Task, callback: Optional[Callable[[str, str], None]]):
+        """Entrega la respuesta de un modo que terminó en segundo plano"""
+        if task.cancelled():
+            return
+        if callback is not None:
+            callback(mode, task.result())
+        else:
+            logger.info(f"⏱️ Respuesta tardía ({mode}) disponible")
+    
+    async def wait_pending_queries(self):
+        """
+        Espera a las consultas que siguen en segundo plano
+        """
+        if self._pending_queries:
+            await asyncio.gather(*self._pending_queries, return_exceptions=True)
 
 async def main():
     """
@@ -272,75 +549,90 @@ async def main():
     # Crear instancia del RAG
     rag = SimpleFinancialRAG(working_dir="simple_rag_knowledge")
     
-    # Inicializar
-    logger.info("\n1️⃣ INICIALIZACIÓN")
-    await rag.initialize()
-    
-    # Insertar datos
-    logger.info("\n2️⃣ INSERCIÓN DE DATOS")
-    chunks_path = "data/embeddings/chunks_with_embeddings_lightrag.json"
-    
-    if Path(chunks_path).exists():
-        inserted, failed = await rag.insert_financial_data(chunks_path)
-    else:
-        logger.error(f"❌ No se encontró: {chunks_path}")
-        logger.info("Ejecuta primero: python3 scripts/generate_embeddings.py")
-        return
-    
-    # Realizar consultas de prueba
-    logger.info("\n3️⃣ CONSULTAS DE PRUEBA")
-    
-    test_queries = [
-        "¿Cuál es mi situación financiera general?",
-        "¿En qué categorías gasto más dinero?",
-        "¿Cuánto gasté en Groceries?",
-        "¿Tengo gastos recurrentes o suscripciones?",
-        "¿Cuál fue mi mayor gasto del mes?",
-        "Dame recomendaciones para ahorrar dinero"
-    ]
-    
-    logger.info("\n" + "-"*60)
-    logger.info("PROBANDO DIFERENTES MODOS DE CONSULTA")
-    logger.info("-"*60)
-    
-    # Probar modo hybrid (recomendado)
-    for i, query in enumerate(test_queries[:3], 1):
-        logger.info(f"\n📝 Consulta {i}: {query}")
-        response = await rag.query(query, mode="hybrid")
-        
-        # Mostrar respuesta (truncada si es muy larga)
-        if len(response) > 300:
-            preview = response[:300] + "..."
+    # Liberar conexiones y caché aunque falle la inserción o una consulta
+    try:
+        # Inicializar
+        logger.info("\n1️⃣ INICIALIZACIÓN")
+        await rag.initialize()
+        
+        # Insertar datos
+        logger.info("\n2️⃣ INSERCIÓN DE DATOS")
+        chunks_path = "data/embeddings/chunks_with_embeddings_lightrag.json"
+        
+        if Path(chunks_path).exists():
+            inserted, failed = await rag.insert_financial_data(chunks_path)
         else:
-            preview = response
+            logger.error(f"❌ No se encontró: {chunks_path}")
+            logger.info("Ejecuta primero: python3 scripts/generate_embeddings.py")
+            return
+        
+        # Realizar consultas de prueba
+        logger.info("\n3️⃣ CONSULTAS DE PRUEBA")
+        
+        test_queries = [
+            "¿Cuál es mi situación financiera general?",
+            "¿En qué categorías gasto más dinero?",
+            "¿Cuánto gasté en Groceries?",
+            "¿Tengo gastos recurrentes o suscripciones?",
+            "¿Cuál fue mi mayor gasto del mes?",
+            "Dame recomendaciones para ahorrar dinero"
+        ]
+        
+        logger.info("\n" + "-"*60)
+        logger.info("PROBANDO DIFERENTES MODOS DE CONSULTA")
+        logger.info("-"*60)
+        
+        # Probar modo hybrid (recomendado)
+        for i, query in enumerate(test_queries[:3], 1):
+            logger.info(f"\n📝 Consulta {i}: {query}")
+            # Solo se muestra una vista previa: no generar la respuesta completa
+            response = await rag.query_stream(query, mode="hybrid", max_preview_chars=300)
+        
+            # Mostrar respuesta (truncada si es muy larga)
+            if len(response) > 300:
+                preview = response[:300] + "..."
+            else:
+                preview = response
         
-        logger.info(f"🤖 Respuesta: {preview}")
-    
-    # Comparar modos
-    logger.info("\n" + "-"*60)
-    logger.info("COMPARACIÓN DE MODOS")
-    logger.info("-"*60)
-    
-    comparison_query = "¿Cuáles son mis principales gastos?"
-    
-    for mode in ["naive", "local", "hybrid"]:
-        logger.info(f"\n🔍 Modo: {mode}")
-        response = await rag.query(comparison_query, mode=mode)
+            logger.info(f"🤖 Respuesta: {preview}")
         
-        if "[no-context]" in response:
-            logger.info("   ⚠️ Sin contexto suficiente")
-        else:
-            preview = response[:200] + "..." if len(response) > 200 else response
-            logger.info(f"   → {preview}")
-    
-    logger.info("\n" + "="*60)
-    logger.info("✅ DEMO COMPLETADA")
-    logger.info("="*60)
-    logger.info("\nEl sistema RAG está listo para:")
-    logger.info("  • Responder preguntas sobre tus finanzas")
-    logger.info("  • Generar análisis con IA")
-    logger.info("  • Proporcionar recomendaciones personalizadas")
-    logger.info("\n💡 Nota: Con más datos, las respuestas serán más precisas")
+        # Comparar modos
+        logger.info("\n" + "-"*60)
+        logger.info("COMPARACIÓN DE MODOS")
+        logger.info("-"*60)
+        
+        comparison_query = "¿Cuáles son mis principales gastos?"
+        
+        def show_mode_response(mode: str, response: str):
+            logger.info(f"\n🔍 Modo: {mode}")
+        
+            if "[no-context]" in response:
+                logger.info("   ⚠️ Sin contexto suficiente")
+            else:
+                preview = response[:200] + "..." if len(response) > 200 else response
+                logger.info(f"   → {preview}")
+        
+        # Los modos rápidos se muestran en cuanto terminan; los de grafo, al llegar
+        responses = await rag.query_multi_mode(
+            comparison_query,
+            ["naive", "local", "hybrid"],
+            on_late_result=show_mode_response
+        )
+        for mode, response in responses.items():
+            show_mode_response(mode, response)
+        
+        await rag.wait_pending_queries()
+        
+        logger.info("\n" + "="*60)
+        logger.info("✅ DEMO COMPLETADA")
+        logger.info("="*60)
+        logger.info("\nEl sistema RAG está listo para:")
+        logger.info("  • Responder preguntas sobre tus finanzas")
+        logger.info("  • Generar análisis con IA")
+        logger.info("  • Proporcionar recomendaciones personalizadas")
+        logger.info("\n💡 Nota: Con más datos, las respuestas serán más precisas")
+    finally:
+        await rag.aclose()
 
 
 if __name__ == "__main__":
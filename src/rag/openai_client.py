@@ -0,0 +1,188 @@
+"""
+Cliente OpenAI compartido para LightRAG
+Un único AsyncOpenAI sobre un pool httpx (HTTP/2 si está disponible)
+para todas las llamadas de embeddings y de LLM, en lugar de crear un
+cliente (y una conexión TLS) nuevo en cada llamada.
+
+Todas las peticiones pasan por un limitador de tasa compartido
+(OPENAI_RPM peticiones por minuto, si aiolimiter está instalado) y se
+reintentan con backoff exponencial ante 429 y errores transitorios,
+respetando la cabecera Retry-After.
+"""
+
+import asyncio
+import contextlib
+import logging
+import os
+import random
+from typing import AsyncIterator, Dict, List, Optional, Union
+
+import httpx
+import numpy as np
+import openai
+from openai import AsyncOpenAI
+
+try:
+    import h2  # noqa: F401  (necesario para http2=True en httpx)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+try:
+    from aiolimiter import AsyncLimiter
+    AIOLIMITER_AVAILABLE = True
+except ImportError:
+    AIOLIMITER_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Peticiones por minuto permitidas (límite de la cuenta de OpenAI)
+DEFAULT_RPM = 3500
+
+# Reintentos ante límites de tasa y errores transitorios
+MAX_ATTEMPTS = 6
+BACKOFF_INITIAL_SECONDS = 1
+BACKOFF_MAX_SECONDS = 30
+RETRYABLE_ERRORS = (
+    openai.RateLimitError,
+    openai.APIConnectionError,
+    openai.APITimeoutError,
+    openai.InternalServerError,
+)
+
+# Argumentos internos de LightRAG que no se envían a la API
+_LIGHTRAG_KWARGS = ("hashing_kv", "enable_cot")
+
+
+class SharedOpenAIClient:
+    """
+    Funciones de embeddings y de LLM compatibles con LightRAG que
+    reutilizan las mismas conexiones HTTP
+    """
+
+    def __init__(
+        self,
+        llm_model: str = "gpt-4o-mini",
+        embedding_model: str = "text-embedding-3-small",
+        max_connections: int = 50,
+        max_keepalive_connections: int = 20,
+        timeout: float = 60
+    ):
+        """
+        Args:
+            llm_model: Modelo de chat para extracción y respuestas
+            embedding_model: Modelo de embeddings
+            max_connections: Conexiones simultáneas máximas del pool
+            max_keepalive_connections: Conexiones que se mantienen abiertas
+            timeout: Timeout por petición (segundos)
+        """
+        self.llm_model = llm_model
+        self.embedding_model = embedding_model
+        self.http = httpx.AsyncClient(
+            http2=HTTP2_AVAILABLE,
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections
+            )
+        )
+        # Usa OPENAI_API_KEY / OPENAI_BASE_URL del entorno; los reintentos
+        # se gestionan en `_request` para que pasen por el limitador
+        self.client = AsyncOpenAI(http_client=self.http, max_retries=0)
+
+        rpm = int(os.getenv("OPENAI_RPM", DEFAULT_RPM))
+        self.limiter = AsyncLimiter(max_rate=rpm, time_period=60) if AIOLIMITER_AVAILABLE else None
+
+    async def _request(self, create, **kwargs):
+        """
+        Realiza una petición a la API respetando el límite de tasa y
+        reintentando con backoff exponencial (o Retry-After si viene)
+        """
+        for attempt in range(1, MAX_ATTEMPTS + 1):
+            async with self.limiter or contextlib.nullcontext():
+                try:
+                    return await create(**kwargs)
+                except RETRYABLE_ERRORS as e:
+                    if attempt == MAX_ATTEMPTS:
+                        raise
+                    error = e
+
+            # Esperar fuera del limitador para no ocupar su capacidad
+            delay = _retry_after(error)
+            if delay is None:
+                delay = min(BACKOFF_MAX_SECONDS, BACKOFF_INITIAL_SECONDS * 2 ** (attempt - 1))
+                delay += random.uniform(0, delay / 2)
+
+            logger.warning(f"⚠️ {type(error).__name__}, reintento {attempt}/{MAX_ATTEMPTS - 1} en {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+    async def embed(self, texts: List[str]) -> np.ndarray:
+        """Calcula los embeddings de `texts` (sustituye a `openai_embed`)"""
+        response = await self._request(
+            self.client.embeddings.create,
+            model=self.embedding_model,
+            input=texts,
+            encoding_format="float"
+        )
+        return np.array([item.embedding for item in response.data])
+
+    async def complete(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        history_messages: Optional[List[Dict]] = None,
+        keyword_extraction: bool = False,
+        **kwargs
+    ) -> Union[str, AsyncIterator[str]]:
+        """
+        Completa `prompt` con el modelo de chat (sustituye a `gpt_4o_mini_complete`)
+
+        Returns:
+            Texto de la respuesta, o un iterador de fragmentos si `stream=True`
+        """
+        for key in _LIGHTRAG_KWARGS:
+            kwargs.pop(key, None)
+        if keyword_extraction:
+            kwargs["response_format"] = {"type": "json_object"}
+
+        messages = []
+        if system_prompt:
+            messages.append({"role": "system", "content": system_prompt})
+        messages.extend(history_messages or [])
+        messages.append({"role": "user", "content": prompt})
+
+        response = await self._request(
+            self.client.chat.completions.create,
+            model=self.llm_model,
+            messages=messages,
+            **kwargs
+        )
+
+        if kwargs.get("stream"):
+            return self._iter_stream(response)
+        return response.choices[0].message.content
+
+    @staticmethod
+    async def _iter_stream(response) -> AsyncIterator[str]:
+        try:
+            async for chunk in response:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        finally:
+            # Si el consumidor deja de leer, cerrar la conexión corta la generación
+            await response.close()
+
+    async def aclose(self):
+        """Cierra el pool de conexiones"""
+        await self.http.aclose()
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    """Segundos indicados por la cabecera Retry-After del error, si existe"""
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    try:
+        return float(response.headers["retry-after"])
+    except (KeyError, ValueError):
+        return None
@@ -0,0 +1,8 @@
+"""
+Utilities module for pregunta-tus-finanzas
+Shared helpers for loading pipeline data
+"""
+
+from .data_cache import load_transactions
+
+__all__ = ["load_transactions"]
@@ -0,0 +1,93 @@
+"""
+Cached loading of extracted transaction files
+
+Several pipeline steps read the same extraction JSON (e.g. the chunking
+pipeline and the chunk generator it drives). `load_transactions` parses
+each file once per process and returns the cached list afterwards; the
+cache is keyed by path and modification time, so a rewritten file is
+parsed again.
+
+Files larger than STREAMING_THRESHOLD_BYTES are streamed with ijson (if
+installed) so only the transaction list is materialized, not the whole
+document plus its raw text. Smaller files are read in one shot and decoded
+with orjson when it is installed.
+"""
+
+import json
+import logging
+import os
+from functools import lru_cache
+from typing import Dict, List
+
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Above this size the file is streamed instead of loaded with json.load
+STREAMING_THRESHOLD_BYTES = 50 * 1024 * 1024
+
+
+def load_transactions(path: str) -> List[Dict]:
+    """
+    Load the transaction list from an extraction JSON file.
+
+    Accepts {"transactions": [...]}, a bare list, or {"data": [...]}.
+    The returned list is shared between callers and must not be mutated.
+
+    Args:
+        path: Path to the JSON file
+
+    Returns:
+        List of transaction dicts
+    """
+    path = os.path.abspath(path)
+    return _load_transactions(path, os.stat(path).st_mtime_ns)
+
+
+@lru_cache(maxsize=4)
+def _load_transactions(path: str, mtime_ns: int) -> List[Dict]:
+    if IJSON_AVAILABLE and os.path.getsize(path) > STREAMING_THRESHOLD_BYTES:
+        logger.info(f"Streaming transactions from {path}")
+        return _stream_transactions(path)
+
+    if ORJSON_AVAILABLE:
+        with open(path, 'rb') as f:
+            data = orjson.loads(f.read())
+    else:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+
+    if isinstance(data, dict) and 'transactions' in data:
+        return data['transactions']
+    if isinstance(data, list):
+        return data
+    return data.get('data', [])
+
+
+def _stream_transactions(path: str) -> List[Dict]:
+    """Parse only the transaction items of a large file"""
+    with open(path, 'rb') as f:
+        # Peek at the top-level container to choose the item prefix
+        first = f.read(1)
+        while first.isspace():
+            first = f.read(1)
+        f.seek(0)
+
+        if first == b'[':
+            return list(ijson.items(f, 'item', use_float=True))
+
+        transactions = list(ijson.items(f, 'transactions.item', use_float=True))
+        if not transactions:
+            f.seek(0)
+            transactions = list(ijson.items(f, 'data.item', use_float=True))
+        return transactions
@@ -8,8 +8,16 @@ from pathlib import Path
 sys.path.append(str(Path(__file__).parent))
 
 from src.extractors.bbva_extractor import BBVAExtractor
-import pandas as pd
-import json
+import csv
+import itertools
+from collections import Counter
+
+# orjson es opcional: serializa más rápido y admite tipos de NumPy
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
 print("=" * 80)
 print("FASE 1: INGESTA DE DATOS - BBVA EXTRACTOR")
@@ -32,10 +40,15 @@ print("-" * 40)
 input_file = "examples/sample_data.csv"
 print(f"Archivo de entrada: {input_file}")
 
-# Primero veamos el contenido crudo del CSV
-df_raw = pd.read_csv(input_file, sep=';', nrows=3)
+# Primero veamos el contenido crudo del CSV (sin construir un DataFrame)
+with open(input_file, encoding='utf-8', newline='') as f:
+    reader = csv.reader(f, delimiter=';')
+    header = next(reader)
+    rows = list(itertools.islice(reader, 3))
 print("\nPrimeras 3 filas del CSV (crudo):")
-print(df_raw.to_string())
+print(" | ".join(header))
+for row in rows:
+    print(" | ".join(row))
 
 # Ahora procesemos con el extractor
 print("\n3. PROCESO DE EXTRACCIÓN")
@@ -53,18 +66,20 @@ print("-" * 40)
 transactions = result['transactions']
 print(f"Total de transacciones: {len(transactions)}")
 
-print("\nPrimeras 3 transacciones procesadas:")
+# Las líneas del informe se acumulan y se escriben de una vez
+lines = ["\nPrimeras 3 transacciones procesadas:"]
 for i, t in enumerate(transactions[:3]):
-    print(f"\nTransacción {i+1}:")
-    print(f"  - Fecha: {t['date']}")
-    print(f"  - Fecha valor: {t['value_date']}")
-    print(f"  - Descripción: {t['description']}")
-    print(f"  - Descripción limpia: {t['description_clean']}")
-    print(f"  - Monto: {t['amount']}€")
-    print(f"  - Divisa: {t['currency']}")
-    print(f"  - Categoría detectada: {t['category']}")
-    print(f"  - Categoría BBVA: {t['bbva_category']}")
-    print(f"  - Notas: {t['notes']}")
+    lines.append(f"\nTransacción {i+1}:")
+    lines.append(f"  - Fecha: {t['date']}")
+    lines.append(f"  - Fecha valor: {t['value_date']}")
+    lines.append(f"  - Descripción: {t['description']}")
+    lines.append(f"  - Descripción limpia: {t['description_clean']}")
+    lines.append(f"  - Monto: {t['amount']}€")
+    lines.append(f"  - Divisa: {t['currency']}")
+    lines.append(f"  - Categoría detectada: {t['category']}")
+    lines.append(f"  - Categoría BBVA: {t['bbva_category']}")
+    lines.append(f"  - Notas: {t['notes']}")
+print("\n".join(lines))
 
 # Analizar el proceso de categorización
 print("\n5. PROCESO DE CATEGORIZACIÓN")
@@ -75,20 +90,21 @@ print("  2. Patrones de texto específicos")
 print("  3. Categoría por defecto: 'Other'")
 
 print("\nCategorización aplicada:")
-category_counts = {}
-for t in transactions:
-    cat = t['category']
-    category_counts[cat] = category_counts.get(cat, 0) + 1
+category_counts = Counter(t['category'] for t in transactions)
 
-for cat, count in sorted(category_counts.items()):
-    print(f"  - {cat}: {count} transacciones")
+print("\n".join(f"  - {cat}: {count} transacciones" for cat, count in sorted(category_counts.items())))
 
 # Analizar las estadísticas
 print("\n6. ESTADÍSTICAS CALCULADAS")
 print("-" * 40)
 stats = result['statistics']
 print(f"Estadísticas generadas:")
-print(json.dumps(stats, indent=2, ensure_ascii=False))
+if ORJSON_AVAILABLE:
+    options = orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+    print(orjson.dumps(stats, option=options).decode())
+else:
+    import json
+    print(json.dumps(stats, indent=2, ensure_ascii=False))
 
 # Analizar el período
 print("\n7. PERÍODO DETECTADO")
@@ -96,8 +112,7 @@ print("-" * 40)
 period = result.get('period', {})
 print(f"Período de las transacciones:")
 if period:
-    for key, value in period.items():
-        print(f"  - {key}: {value}")
+    print("\n".join(f"  - {key}: {value}" for key, value in period.items()))
 else:
     print("  No se detectó período")
 
@@ -106,23 +121,27 @@ print("\n8. METADATA")
 print("-" * 40)
 metadata = result.get('metadata', {})
 print(f"Información adicional:")
-for key, value in metadata.items():
-    print(f"  - {key}: {value}")
+if metadata:
+    print("\n".join(f"  - {key}: {value}" for key, value in metadata.items()))
 
 # Análisis del procesamiento de montos
 print("\n9. PROCESAMIENTO DE MONTOS")
 print("-" * 40)
-print("El extractor procesa los montos:")
+print("El extractor procesa los montos (operaciones vectorizadas sobre la columna):")
 print("  1. Detecta formato español (1.234,56) vs inglés (1,234.56)")
 print("  2. Convierte comas decimales a puntos")
 print("  3. Elimina separadores de miles")
 print("  4. Convierte a float")
 
-# Mostrar ejemplos de conversión
-for t in transactions[:3]:
+# Mostrar ejemplos de conversión y comprobarlos contra el CSV crudo
+importe_idx = header.index('Importe')
+for t, row in zip(transactions[:3], rows):
+    raw = row[importe_idx]
+    expected = float(raw.replace('.', '').replace(',', '.'))
     print(f"\n  Concepto: {t['description'][:30]}")
-    print(f"  Monto procesado: {t['amount']}€")
+    print(f"  Monto crudo: {raw} -> procesado: {t['amount']}€")
     print(f"  Tipo: {'Gasto' if t['amount'] < 0 else 'Ingreso'}")
+    assert abs(t['amount'] - expected) < 1e-9, f"Monto mal convertido: {raw} -> {t['amount']}"
 
 # Resumen final
 print("\n" + "=" * 80)